@@ -0,0 +1,223 @@
+"""Offline benchmarks for the data paths in streamlit_app.py
+
+Runs against FakeSupabaseClient with a synthetic images table, so no network or
+credentials are needed:
+
+    python benchmark.py --rows 10000 100000 500000 --latency-ms 20 --output bench.json
+    python benchmark.py --rows 10000 100000 --baseline bench.json
+
+With --baseline, cases whose median time grew by more than --tolerance are
+reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# Cached functions warn about running without a Streamlit runtime on every call
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import streamlit as st
+
+import streamlit_app as app
+from compact_frames import compact_images_frame
+from data_access import SupabaseRepository, split_columns
+from fake_supabase import FakeSupabaseClient, synthetic_images
+from review_journal import ReviewJournal, WriteBehindQueue
+
+DEFAULT_ROWS = [10_000, 100_000]
+DEFAULT_REPEAT = 3
+# Records saved per run of the save benchmarks, and images stepped through by the navigation benchmark
+SAVE_RECORDS = 500
+NAVIGATION_STEPS = 2_000
+# Share of rows touched between syncs for the delta-sync benchmark
+DELTA_FRACTION = 0.01
+
+
+def timed(run, setup=None, repeat=DEFAULT_REPEAT, client=None):
+    """Median/min wall time of run() over repeat runs, with setup() untimed before each"""
+    durations = []
+    requests = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        before = client.requests if client else 0
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+        requests = client.requests - before if client else 0
+    return {
+        "median_s": round(statistics.median(durations), 6),
+        "min_s": round(min(durations), 6),
+        "requests": requests
+    }
+
+
+def edit_batch(ids, round_number):
+    """Mixed edits as the Browse Data and review pages produce them (several field signatures)"""
+    changes = {}
+    for i, record_id in enumerate(ids):
+        record_id = int(record_id)
+        if i % 3 == 0:
+            changes[record_id] = {"prompt": f"benchmark prompt {round_number}-{i}"}
+        elif i % 3 == 1:
+            changes[record_id] = {"image_status": bool(i % 2), "notes": f"round {round_number}"}
+        else:
+            changes[record_id] = {"prompt": f"benchmark prompt {round_number}-{i}", "image_status": True}
+    return changes
+
+
+def run_suite(rows, latency, row_latency, repeat):
+    client = FakeSupabaseClient(synthetic_images(rows), latency=latency, row_latency=row_latency)
+    app.get_supabase_client = lambda: client
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    results = {}
+
+    def reset_snapshot():
+        app.get_image_snapshot.clear()
+
+    results["load_all_data.cold"] = timed(app.load_all_data, reset_snapshot, repeat, client)
+
+    # Delta sync after a small share of rows changed on the server
+    app.load_all_data()
+    touched = client.tables["images"]["id"].sample(frac=DELTA_FRACTION, random_state=0).tolist()
+    round_counter = iter(range(1_000_000))
+
+    def touch_rows():
+        with client.lock:
+            positions = client.tables["images"].index[client.tables["images"]["id"].isin(touched)]
+            client.assign("images", positions, {"notes": f"touched {next(round_counter)}"})
+        app.get_image_snapshot().expire()
+
+    results["load_all_data.delta_sync"] = timed(app.load_all_data, touch_rows, repeat, client)
+
+    results["get_posts_with_images.cold"] = timed(
+        app.get_posts_with_images, app.get_posts_with_images.clear, repeat, client
+    )
+
+    def overall_progress():
+        progress = app.get_overall_progress()
+        app.format_source_stats(progress["sources"], top_n=app.DASHBOARD_TOP_SOURCES)
+
+    results["get_overall_progress"] = timed(overall_progress, app.get_progress_report.clear, repeat, client)
+
+    # compute_source_stats() aggregates Browse Data frames, which carry prompt and image_status;
+    # the snapshot has no prompt column, so it would skip the completed counts
+    stats_frame = compact_images_frame(client.tables["images"][split_columns(app.BROWSE_COLUMNS)])
+    results["compute_source_stats.browse"] = timed(lambda: app.compute_source_stats(stats_frame, top_n=20), repeat=repeat)
+
+    snapshot_frame = app.get_image_snapshot().frame
+
+    results["review_index.build"] = timed(lambda: app.ReviewIndex(snapshot_frame), repeat=repeat)
+
+    review_index = app.ReviewIndex(snapshot_frame)
+
+    def navigate():
+        position = (0, 0)
+        for _ in range(min(NAVIGATION_STEPS, review_index.total - 1)):
+            review_index.image(*position)
+            review_index.upcoming(*position, 5)
+            position = review_index.next(*position)
+
+    results["review_index.navigate"] = timed(navigate, repeat=repeat)
+
+    # Browse Data save: one bulk save_records() call
+    ids = client.tables["images"]["id"].sample(n=min(SAVE_RECORDS, rows), random_state=1).tolist()
+    save_round = iter(range(1_000_000))
+    results["save_records.browse"] = timed(
+        lambda: app.save_records(SupabaseRepository(client), edit_batch(ids, next(save_round))), repeat=repeat, client=client
+    )
+
+    # Review save: journaled write-behind queue, flushed on demand (timer disabled)
+    with tempfile.TemporaryDirectory() as journal_dir:
+        queue = WriteBehindQueue(
+            ReviewJournal(os.path.join(journal_dir, "journal.sqlite3")),
+            save=lambda changes_by_id: app.save_records(SupabaseRepository(client), changes_by_id),
+            on_saved=app.apply_saved_changes,
+            interval=3600,
+            batch_size=len(ids) + 1
+        )
+
+        def enqueue():
+            for record_id, changes in edit_batch(ids, next(save_round)).items():
+                queue.enqueue(record_id, changes)
+
+        results["review_queue.enqueue"] = timed(enqueue, queue.flush, repeat)
+        results["review_queue.flush"] = timed(queue.flush, enqueue, repeat, client)
+        queue.stop()
+        queue.journal.connection.close()
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions as (rows, case, baseline_s, current_s) for cases slower than baseline by more than tolerance"""
+    regressions = []
+    for rows, cases in results.items():
+        for case, timing in cases.items():
+            previous = baseline.get(rows, {}).get(case)
+            if previous and timing["median_s"] > previous["median_s"] * (1 + tolerance):
+                regressions.append((rows, case, previous["median_s"], timing["median_s"]))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    for rows, cases in results.items():
+        print(f"\n{int(rows):,} images")
+        for case, timing in cases.items():
+            line = f"  {case:<32} {timing['median_s'] * 1000:10.1f} ms  (min {timing['min_s'] * 1000:.1f} ms, {timing['requests']} requests)"
+            previous = (baseline or {}).get(rows, {}).get(case)
+            if previous and previous["median_s"] > 0:
+                line += f"  {timing['median_s'] / previous['median_s']:.2f}x baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamlit_app.py data paths against a fake Supabase client")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Image counts to benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated round trip per request")
+    parser.add_argument("--row-latency-us", type=float, default=0.0, help="Simulated transfer time per returned row")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = run_suite(rows, args.latency_ms / 1000, args.row_latency_us / 1_000_000, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": platform.python_version(),
+                    "latency_ms": args.latency_ms,
+                    "row_latency_us": args.row_latency_us,
+                    "repeat": args.repeat
+                },
+                "results": results
+            }, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for rows, case, previous, current in regressions:
+            print(f"REGRESSION {int(rows):,} images {case}: {previous * 1000:.1f} ms -> {current * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+# Seconds between polls of the images_changes log
+FEED_POLL_INTERVAL = float(os.environ.get("VNA_FEED_INTERVAL", "2"))
+# Changes read per poll; a longer backlog is read by polling again straight away
+FEED_BATCH_SIZE = 1000
+# Sequence numbers are taken at insert time, not commit time, so a transaction can commit
+# after a later one has been read: every poll re-reads this many numbers below the newest seen
+FEED_OVERLAP = 200
+
+
+class ChangeFeed:
+    """Polls the images_changes log on a background thread and hands new changes to a callback
+
+    latest_seq() returns the newest sequence number in the log; fetch_changes(after, limit)
+    returns change rows ({seq, image_id, op, fields}) with seq > after, in seq order.
+    on_changes(changes) runs on the worker with every batch of changes not seen before.
+    The feed starts at the newest change: caches loaded before it started are kept
+    current by their own syncs, so history is not replayed.
+    """
+
+    def __init__(self, latest_seq, fetch_changes, on_changes, interval=FEED_POLL_INTERVAL,
+                 batch_size=FEED_BATCH_SIZE, overlap=FEED_OVERLAP):
+        self.latest_seq = latest_seq
+        self.fetch_changes = fetch_changes
+        self.on_changes = on_changes
+        self.interval = interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        self.seq = None     # newest sequence number seen
+        self._start = None  # newest sequence number when the feed started; nothing below it is read
+        self._seen = set()  # sequence numbers seen within the overlap window
+
+        self.polls = 0
+        self.applied = 0
+        self.last_error = None
+        self.last_poll_at = None
+        self.last_change_at = None
+
+        self._worker = threading.Thread(target=self._run, name="images-change-feed", daemon=True)
+        self._worker.start()
+
+    def poll(self):
+        """Read the log once and apply what is new; returns the number of rows read"""
+        with self.lock:
+            if self.seq is None:
+                self.seq = self._start = self.latest_seq() or 0
+                self.last_poll_at = time.time()
+                return 0
+
+            floor = max(self.seq - self.overlap, self._start)
+            changes = self.fetch_changes(floor, self.batch_size + self.overlap)
+            new = [change for change in changes if change['seq'] not in self._seen]
+            if new:
+                self.on_changes(new)
+                self.seq = max(self.seq, max(change['seq'] for change in new))
+                self.applied += len(new)
+                self.last_change_at = time.time()
+
+            # Only numbers that can still be re-read need remembering
+            floor = self.seq - self.overlap
+            self._seen = {seq for seq in self._seen if seq > floor}
+            self._seen.update(change['seq'] for change in new if change['seq'] > floor)
+
+            self.polls += 1
+            self.last_poll_at = time.time()
+            return len(changes)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "seq": self.seq,
+                "polls": self.polls,
+                "applied": self.applied,
+                "last_error": self.last_error,
+                "last_poll_at": self.last_poll_at,
+                "last_change_at": self.last_change_at
+            }
+
+    def stop(self):
+        self._stopped.set()
+        self._worker.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                backlog = self.poll() >= self.batch_size + self.overlap
+                self.last_error = None
+            except Exception as e:
+                # e.g. images_changes not created yet; keep polling at the normal pace
+                backlog = False
+                self.last_error = str(e)
+            if not backlog:
+                self._stopped.wait(self.interval)
@@ -0,0 +1,92 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# source_url repeats for every image of a post: store each distinct URL once
+CATEGORY_COLUMNS = ["source_url"]
+# Mostly-unique text: Arrow-backed strings instead of one Python object per cell
+STRING_COLUMNS = ["image_url", "cdn_url", "image_title", "image_alt", "updated_at"]
+BOOLEAN_COLUMNS = ["image_status"]
+
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+
+def compact_images_frame(df):
+    """Return df with the images table columns converted to compact dtypes
+
+    Categorical source_url, Arrow strings for URLs and text, nullable boolean
+    image_status and the smallest integer type that holds the ids. Missing
+    columns are skipped and already-compact columns are left as they are.
+    """
+    if df.empty:
+        return df
+
+    columns = {}
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            columns[column] = df[column].astype("category")
+    for column in STRING_COLUMNS:
+        if column in df.columns and df[column].dtype != ARROW_STRING:
+            columns[column] = df[column].astype(ARROW_STRING)
+    for column in BOOLEAN_COLUMNS:
+        if column in df.columns and df[column].dtype != "boolean":
+            columns[column] = df[column].astype("boolean")
+    if "id" in df.columns:
+        if pd.api.types.is_integer_dtype(df["id"].dtype):
+            columns["id"] = pd.to_numeric(df["id"], downcast="integer")
+        elif df["id"].dtype == object:
+            # Text keys (e.g. UUIDs) share one Arrow buffer instead of a Python string each
+            columns["id"] = df["id"].astype(ARROW_STRING)
+
+    if not columns:
+        return df
+    return df.assign(**columns)
+
+
+def memory_report(before, after):
+    """Per-column deep memory usage of two frames in MB, with a total row"""
+    report = pd.DataFrame({
+        "before_mb": before.memory_usage(deep=True, index=False) / 1024 ** 2,
+        "after_mb": after.memory_usage(deep=True, index=False) / 1024 ** 2,
+    })
+    report.loc["total"] = report.sum()
+    report["saved_pct"] = (1 - report["after_mb"] / report["before_mb"]) * 100
+    report["dtype"] = pd.Series({column: str(dtype) for column, dtype in after.dtypes.items()}).reindex(report.index, fill_value="")
+    return report.round(2)
+
+
+def synthetic_images_frame(rows, images_per_post=50, seed=0):
+    """Images-table shaped frame with object columns, as pd.DataFrame(response.data) builds it"""
+    rng = np.random.default_rng(seed)
+    post = np.arange(rows) // images_per_post
+    base = "https://www.vietnamairlines.com/vn/vi/useful-information/travel-guide"
+    status = rng.choice(np.array([True, False, None], dtype=object), size=rows, p=[0.6, 0.1, 0.3])
+
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "source_url": [f"{base}/post-{p}-things-to-do-in-ha-noi" for p in post],
+        "image_url": [f"{base}/images/post-{p}/photo-{i}.jpg" for i, p in enumerate(post)],
+        "cdn_url": [f"https://cdn.example.com/vna/{i:08d}.webp" for i in range(rows)],
+        "image_title": [f"Ha Noi old quarter photo {i}" for i in range(rows)],
+        "image_alt": [f"Street view of the old quarter in Ha Noi, image {i}" for i in range(rows)],
+        "image_status": pd.Series(status, dtype=object),
+        "updated_at": ["2025-12-31T00:00:00+00:00"] * rows,
+    }).astype({"source_url": object, "image_url": object, "cdn_url": object,
+               "image_title": object, "image_alt": object, "updated_at": object})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of the cached images frame before/after compact dtypes")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--images-per-post", type=int, default=50)
+    args = parser.parse_args()
+
+    before = synthetic_images_frame(args.rows, args.images_per_post)
+    after = compact_images_frame(before)
+    print(f"{args.rows:,} rows, {args.images_per_post} images per post")
+    print(memory_report(before, after).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+from data_access import create_repository
+
+# What the image-editing job reads for every completed image (non-empty prompt)
+EXPORT_COLUMNS = ["id", "image_url", "cdn_url", "prompt", "ref_image_url"]
+EXPORT_FORMATS = ("jsonl", "parquet")
+
+# Rows per keyset page; one page is all that is held in memory, and is written as one unit
+EXPORT_PAGE_SIZE = 1000
+# Parquet part files are closed every this many rows; a closed part is a resume point
+PARQUET_ROWS_PER_FILE = 100_000
+# updated_at is the start time of the writing transaction, so a row can commit with a timestamp
+# below the newest one read: the watermark for the next run is set this many seconds earlier.
+# Rows exported inside that window are listed in the checkpoint so the next run skips them.
+EXPORT_WATERMARK_OVERLAP = 60
+
+
+def iter_completed_pages(repository, after_id=None, page_size=EXPORT_PAGE_SIZE, updated_since=None, until_id=None):
+    """Pages of completed images in id order, each read by seeking past the last id of the previous one
+
+    Rows have EXPORT_COLUMNS and updated_at. With updated_since only rows updated after it are
+    read, and with until_id only ids up to it.
+    """
+    while True:
+        rows = repository.completed_page(", ".join(EXPORT_COLUMNS + ["updated_at"]), after_id, page_size, updated_since)
+        full = len(rows) == page_size
+        if until_id is not None:
+            rows = [row for row in rows if row["id"] <= until_id]
+            full = full and len(rows) == page_size
+        if not rows:
+            return
+        yield rows
+        if not full:
+            return
+        after_id = rows[-1]["id"]
+
+
+def export_watermark(repository):
+    """updated_at from which the next resume re-exports changed rows, taken before this run reads any"""
+    latest = repository.latest_update()
+    if latest is None:
+        return None
+    return (pd.Timestamp(latest) - pd.Timedelta(seconds=EXPORT_WATERMARK_OVERLAP)).isoformat()
+
+
+def updated_after(pairs, watermark):
+    """The [id, updated_at] pairs whose updated_at is later than watermark"""
+    if watermark is None or not pairs:
+        return []
+    later = pd.to_datetime([updated_at for _, updated_at in pairs], utc=True, format="ISO8601") > pd.Timestamp(watermark)
+    return [list(pair) for pair, keep in zip(pairs, later) if keep]
+
+
+def checkpoint_path(path):
+    return f"{path.rstrip(os.sep)}.checkpoint.json"
+
+
+def load_checkpoint(path):
+    try:
+        with open(checkpoint_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """Atomically replace the checkpoint, so an interrupted run leaves the previous one intact"""
+    target = checkpoint_path(path)
+    with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{target}.tmp", target)
+
+
+class JsonlExport:
+    """Appends rows to a JSON Lines file; the checkpoint holds the byte offset after the last durable page"""
+
+    def __init__(self, path, checkpoint=None):
+        offset = checkpoint["offset"] if checkpoint else 0
+        self.file = open(path, "r+b" if offset and os.path.exists(path) else "wb")
+        # Lines written after the checkpoint by an interrupted run are dropped and exported again
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def write(self, rows):
+        self.file.write("".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows).encode("utf-8"))
+
+    def commit(self):
+        """Make everything written durable; returns the checkpoint fields for this point"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"offset": self.file.tell()}
+
+    def close(self):
+        state = self.commit()
+        self.file.close()
+        return state
+
+
+class ParquetExport:
+    """Writes rows to numbered part files in a directory (one row group per page), readable as one dataset
+
+    A Parquet file is only readable once closed, so only closed parts are checkpointed;
+    parts left open by an interrupted run are deleted and their rows exported again.
+    """
+
+    def __init__(self, path, checkpoint=None, rows_per_file=PARQUET_ROWS_PER_FILE):
+        import pyarrow as pa  # only needed for this format
+
+        self.path = path
+        self.rows_per_file = rows_per_file
+        self.parts = checkpoint["parts"] if checkpoint else 0
+        self.schema = pa.schema([("id", pa.int64())] + [(column, pa.string()) for column in EXPORT_COLUMNS[1:]])
+        self.writer = None
+        self.part_rows = 0
+
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") and name.endswith(".parquet") and int(name[5:-8]) >= self.parts:
+                os.remove(os.path.join(path, name))
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            part_path = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+            self.writer = pq.ParquetWriter(part_path, self.schema, compression="zstd")
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+        self.part_rows += len(rows)
+
+    def commit(self):
+        """Close the part once it is full; returns the checkpoint fields then, else None"""
+        if self.part_rows < self.rows_per_file:
+            return None
+        return self.close()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.parts += 1
+            self.part_rows = 0
+        return {"parts": self.parts}
+
+
+def export_completed(repository, path, fmt="jsonl", resume=False, page_size=EXPORT_PAGE_SIZE,
+                     rows_per_file=PARQUET_ROWS_PER_FILE, on_progress=None):
+    """Stream every completed image to path, checkpointing as it goes; returns the checkpoint
+
+    With resume, the export continues from a previous run's checkpoint. Images completed or
+    re-edited since that run started (updated_at after its watermark) are appended first,
+    whatever their id, then the export continues after the last exported id. A re-edited
+    image is then in the export more than once; its last row is the current one. Rows the
+    watermark overlap reads again with an unchanged updated_at are not written twice.
+    on_progress(rows) is called after every page with the total rows exported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+    checkpoint = load_checkpoint(path) if resume else None
+    if checkpoint and checkpoint.get("format") != fmt:
+        raise ValueError(f"{path} was exported as {checkpoint.get('format')}, not {fmt}")
+    if checkpoint is None:
+        checkpoint = {"format": fmt, "last_id": None, "rows": 0}
+    # An interrupted run is continued with the watermark it took and its progress through the changed rows
+    run = checkpoint.get("run") or {
+        "watermark": export_watermark(repository), "changed_until": checkpoint["last_id"], "changed_after": None,
+        "recent": []
+    }
+    # (id, updated_at) of rows the previous run exported inside this run's watermark overlap
+    exported = {tuple(pair) for pair in checkpoint.get("recent", [])}
+
+    if fmt == "jsonl":
+        export = JsonlExport(path, checkpoint if checkpoint["rows"] else None)
+    else:
+        export = ParquetExport(path, checkpoint if checkpoint["rows"] else None, rows_per_file)
+
+    watermark, last_id = checkpoint.get("watermark"), checkpoint["last_id"]
+
+    def pages():
+        # Rows up to the last exported id that changed since the previous run, then the rows after it
+        if watermark is not None and run["changed_until"] is not None:
+            for rows in iter_completed_pages(repository, run["changed_after"], page_size, watermark, run["changed_until"]):
+                yield True, rows
+        for rows in iter_completed_pages(repository, last_id, page_size):
+            yield False, rows
+
+    # Rows written since the last checkpoint, held back until the writer reports a resume point
+    pending = {"last_id": checkpoint["last_id"], "rows": checkpoint["rows"], "run": run}
+    try:
+        for changed, rows in pages():
+            fresh = [row for row in rows if not changed or (row["id"], row["updated_at"]) not in exported]
+            if fresh:
+                export.write([{column: row[column] for column in EXPORT_COLUMNS} for row in fresh])
+            # Rows the next run's overlap will read again, with the skipped ones since they are exported too
+            recent = pending["run"]["recent"] + updated_after([[row["id"], row["updated_at"]] for row in rows], run["watermark"])
+            if changed:
+                pending = {**pending, "run": {**pending["run"], "changed_after": rows[-1]["id"], "recent": recent}}
+            else:
+                pending = {**pending, "last_id": rows[-1]["id"], "run": {**pending["run"], "recent": recent}}
+            pending["rows"] += len(fresh)
+            state = export.commit()
+            if state is not None:
+                checkpoint = {**checkpoint, **pending, **state}
+                save_checkpoint(path, checkpoint)
+            if on_progress:
+                on_progress(pending["rows"])
+    except BaseException:
+        # The last saved checkpoint stands; anything written after it is discarded on resume
+        export.close()
+        raise
+
+    run = pending.pop("run")
+    recent = dict(map(tuple, updated_after(checkpoint.get("recent", []), run["watermark"]) + run["recent"]))
+    checkpoint = {**checkpoint, **pending, "watermark": run["watermark"], "recent": [list(pair) for pair in recent.items()],
+                  **export.close()}
+    checkpoint.pop("run", None)
+    save_checkpoint(path, checkpoint)
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export completed images and prompts for the image-editing job")
+    parser.add_argument("output", help="JSON Lines file, or directory of Parquet part files")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue a previous export, appending images completed or re-edited since it ran")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument("--rows-per-file", type=int, default=PARQUET_ROWS_PER_FILE,
+                        help="Rows per Parquet part file")
+    args = parser.parse_args()
+
+    repository = create_repository()
+    previous = load_checkpoint(args.output) if args.resume else None
+
+    def report(rows):
+        print(f"\r{rows:,} rows exported", end="", file=sys.stderr)
+
+    checkpoint = export_completed(repository, args.output, args.format, args.resume, args.page_size,
+                                  args.rows_per_file, report)
+    print(file=sys.stderr)
+    added = checkpoint["rows"] - (previous["rows"] if previous else 0)
+    print(f"{added:,} rows added, {checkpoint['rows']:,} in {args.output} (last id {checkpoint['last_id']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+SOURCE_BASE_URL = "https://www.vietnamairlines.com/vn/vi/useful-information/travel-guide"
+PLACES = ["ha-noi", "ho-chi-minh", "da-nang", "hue", "hoi-an", "nha-trang", "phu-quoc", "sa-pa", "ha-long", "da-lat"]
+
+
+def synthetic_images(rows, seed=0):
+    """Images table with a realistic long-tailed distribution of images per post
+
+    Post sizes are log-normal (most posts have 5-30 images, a few have hundreds),
+    rows are stored post by post as the scraper inserts them, about 40% of images
+    already have a prompt, and image_status is True/False/unset.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = []
+    while sum(sizes) < rows:
+        sizes.extend(np.clip(rng.lognormal(mean=2.7, sigma=0.8, size=1024), 1, 400).astype(int))
+    sizes = np.array(sizes)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), rows) + 1]
+    post = np.repeat(np.arange(len(sizes)), sizes)[:rows]
+
+    sources = [f"{SOURCE_BASE_URL}/{PLACES[p % len(PLACES)]}-guide-{p}" for p in range(len(sizes))]
+    status = rng.choice(np.array([True, False, None], dtype=object), size=rows, p=[0.55, 0.15, 0.30])
+    has_prompt = rng.random(rows) < 0.4
+    epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "source_url": pd.Series([sources[p] for p in post], dtype=object),
+        "image_url": pd.Series([f"{sources[p]}/images/photo-{i}.jpg" for i, p in enumerate(post)], dtype=object),
+        "cdn_url": pd.Series([f"https://cdn.example.com/vna/{i:08d}.webp" if i % 3 else None for i in range(rows)], dtype=object),
+        "image_title": pd.Series([f"{PLACES[p % len(PLACES)].replace('-', ' ').title()} photo {i}" for i, p in enumerate(post)], dtype=object),
+        "image_alt": pd.Series([f"Travel guide image {i} of post {p}" for i, p in enumerate(post)], dtype=object),
+        "image_status": pd.Series(status, dtype=object),
+        "prompt": pd.Series(np.where(has_prompt, "Redraw in the airline's brand style", None), dtype=object),
+        "notes": pd.Series([None] * rows, dtype=object),
+        "ref_image_url": pd.Series([None] * rows, dtype=object),
+        "updated_at": pd.Series([(epoch + timedelta(seconds=int(i))).isoformat() for i in range(rows)], dtype=object),
+    })
+
+
+def source_counts(images):
+    """Per-source counters, as the get_progress_summary() RPC and source_progress view return them"""
+    prompt = images["prompt"]
+    return pd.DataFrame({
+        "source_url": images["source_url"],
+        "total_images": 1,
+        "completed_images": (prompt.notna() & (prompt != "")).astype(int),
+        "valid_images": (images["image_status"] == True).astype(int),
+        "invalid_images": (images["image_status"] == False).astype(int),
+    }).groupby("source_url", sort=False).sum().reset_index()
+
+
+def progress_overview(images):
+    """The one-row progress_overview view (the fake has no assignments)"""
+    counts = source_counts(images)
+    row = counts.drop(columns="source_url").sum().to_dict()
+    row.update(total_sources=len(counts), assigned_images=0, refreshed_at=datetime.now(timezone.utc).isoformat())
+    return pd.DataFrame([row])
+
+
+# Tables with row-level security but no INSERT policy (setup_database.sql section 7)
+INSERT_DENIED_TABLES = {"images"}
+
+# Materialized reporting views from setup_database.sql, computed on read
+REPORTING_VIEWS = {
+    "progress_overview": progress_overview,
+    "source_progress": source_counts,
+    "user_progress": lambda images: pd.DataFrame(columns=["id", "username", "role", "assigned_count", "completed_count",
+                                                          "pending_count", "completion_percentage"]),
+}
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """The subset of the postgrest query builder that streamlit_app.py uses"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns = None
+        self.count = None
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.row_limit = None
+
+    def select(self, columns="*", count=None):
+        self.columns = None if columns.strip() == "*" else [column.strip() for column in columns.split(",")]
+        self.count = count
+        return self
+
+    def update(self, values):
+        self.operation = "update"
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def upsert(self, rows, on_conflict="id", default_to_null=True, **kwargs):
+        self.operation = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        self.default_to_null = default_to_null
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda series: series == value)
+
+    def neq(self, column, value):
+        return self._filter(column, lambda series: series != value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda series: series > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda series: series >= value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda series: series < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda series: series <= value)
+
+    def is_(self, column, value):
+        return self._filter(column, lambda series: series.isna() if value in (None, "null") else series == value)
+
+    def in_(self, column, values):
+        return self._filter(column, lambda series: series.isin(list(values)))
+
+    def order(self, column, desc=False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        with self.client.lock:
+            self.client.requests += 1
+            if self.operation == "update":
+                response = self._execute_update()
+            elif self.operation == "upsert":
+                response = self._execute_upsert()
+            elif self.operation == "delete":
+                response = self._execute_delete()
+            else:
+                response = self._execute_select()
+        self.client.wait(len(response.data))
+        return response
+
+    def _filter(self, column, predicate):
+        self.filters.append((column, predicate))
+        return self
+
+    def _mask(self, frame):
+        mask = np.ones(len(frame), dtype=bool)
+        for column, predicate in self.filters:
+            mask &= predicate(frame[column]).fillna(False).to_numpy(dtype=bool)
+        return mask
+
+    def _execute_select(self):
+        frame = self.client.read(self.table)
+        if self.filters:
+            frame = frame[self._mask(frame)]
+
+        # The table is stored in id order, so the common order("id") needs no sort
+        if self.orders and self.orders != [("id", False)]:
+            columns = [column for column, _ in self.orders]
+            frame = frame.sort_values(columns, ascending=[not desc for _, desc in self.orders], kind="stable")
+
+        count = len(frame) if self.count else None
+        end = None if self.row_limit is None else self.offset + self.row_limit
+        frame = frame.iloc[self.offset:end]
+        if self.columns:
+            frame = frame[self.columns]
+        return FakeResponse(frame.to_dict("records"), count)
+
+    def _execute_update(self):
+        frame = self.client.tables[self.table]
+        positions = np.flatnonzero(self._mask(frame))
+        self.client.assign(self.table, positions, self.payload)
+        return FakeResponse(frame.iloc[positions].to_dict("records"))
+
+    def _execute_delete(self):
+        frame = self.client.tables[self.table]
+        mask = self._mask(frame)
+        self.client.tables[self.table] = frame[~mask].reset_index(drop=True)
+        return FakeResponse(frame[mask].to_dict("records"))
+
+    def _execute_upsert(self):
+        # INSERT ... ON CONFLICT DO UPDATE: the INSERT policy applies to every row, conflicting or not
+        if self.table in INSERT_DENIED_TABLES:
+            raise PermissionError(f'new row violates row-level security policy for table "{self.table}"')
+        frame = self.client.tables[self.table]
+        positions = pd.Index(frame[self.on_conflict]).get_indexer([row[self.on_conflict] for row in self.payload])
+        existing = [(position, row) for position, row in zip(positions, self.payload) if position >= 0]
+        self.client.update_rows(self.table, existing)
+        # Keys that do not exist yet are inserted, with the omitted columns left empty
+        inserted = [row for position, row in zip(positions, self.payload) if position < 0]
+        if inserted:
+            self.client.tables[self.table] = pd.concat(
+                [frame, pd.DataFrame(inserted).reindex(columns=frame.columns)], ignore_index=True
+            )
+        return FakeResponse([dict(frame.iloc[position]) for position, _ in existing] + inserted)
+
+
+class FakeRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        function = getattr(self, f"_{self.name}", None)
+        if function is None:
+            raise NotImplementedError(f"RPC {self.name} is not available in the fake client")
+        with self.client.lock:
+            self.client.requests += 1
+            data = function()
+        self.client.wait(len(data))
+        return FakeResponse(data)
+
+    def _get_progress_summary(self):
+        rows = source_counts(self.client.tables["images"])
+        return rows.sort_values("total_images", ascending=False).to_dict("records")
+
+    def _images_without_prompt(self):
+        frame = self.client.tables["images"]
+        prompt = frame["prompt"]
+        missing = frame["id"].isin(self.params["ids"]) & (prompt.isna() | (prompt == ""))
+        return frame.loc[missing, "id"].tolist()
+
+    def _update_images(self):
+        # A plain UPDATE: ids that do not exist are left out of the result, not inserted
+        frame = self.client.tables["images"]
+        changes = self.params["changes"]
+        positions = pd.Index(frame["id"]).get_indexer([row["id"] for row in changes])
+        found = [(position, row) for position, row in zip(positions, changes) if position >= 0]
+        self.client.update_rows("images", found)
+        return [row["id"] for _, row in found]
+
+
+class FakeSupabaseClient:
+    """In-process stand-in for the supabase client, backed by a DataFrame per table
+
+    Every request sleeps latency seconds plus row_latency per returned row, outside
+    the table lock, so concurrent requests overlap like real HTTP calls. Updates
+    bump updated_at the way the trigger in setup_database.sql does.
+    """
+
+    def __init__(self, images, latency=0.0, row_latency=0.0):
+        self.tables = {"images": images.reset_index(drop=True)}
+        self.latency = latency
+        self.row_latency = row_latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._clock = datetime.now(timezone.utc)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def read(self, table):
+        """A stored table, or a reporting view computed from images (caller holds the lock)"""
+        if table in self.tables:
+            return self.tables[table]
+        return REPORTING_VIEWS[table](self.tables["images"])
+
+    def assign(self, table, positions, values):
+        """Write values (a scalar or one value per position) into rows at positions (caller holds the lock)"""
+        frame = self.tables[table]
+        self._clock += timedelta(milliseconds=1)
+        values = {**values, "updated_at": self._clock.isoformat()}
+        for column, value in values.items():
+            frame.iloc[positions, frame.columns.get_loc(column)] = value
+
+    def update_rows(self, table, rows):
+        """Write partial rows, given as (position, row) pairs, grouped by their fields (caller holds the lock)"""
+        groups = {}
+        for position, row in rows:
+            groups.setdefault(tuple(key for key in row if key != "id"), []).append((position, row))
+        for fields, group in groups.items():
+            self.assign(table, [position for position, _ in group], {
+                field: [row[field] for _, row in group] for field in fields
+            })
+
+    def wait(self, rows):
+        delay = self.latency + self.row_latency * rows
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import os
+import sys
+import unicodedata
+from urllib.parse import urlsplit, urlunsplit
+
+from data_access import create_repository
+
+# Spreadsheet header -> posts column; other columns (deadlines, PICs, QC) are not imported
+CSV_COLUMNS = {
+    "Từ khóa chính": "keyword",
+    "Tỉnh thành": "province",
+    "Bài viết": "draft_url",
+    "BTV": "editor",
+    "Bài đăng": "source_url",
+    "Trạng thái": "status",
+}
+
+# Rows per upsert request; memory use is bounded by one chunk regardless of file size
+IMPORT_CHUNK_SIZE = 500
+# Unmatched URLs printed to the console (the --unmatched-report file gets all of them)
+UNMATCHED_PREVIEW = 20
+
+CANONICAL_HOSTS = {"vietnamairlines.com": "www.vietnamairlines.com"}
+
+
+def normalize_post_url(url):
+    """Canonical form of a post URL, compared on both sides when matching posts to images.source_url
+
+    https scheme, lowercase host (bare vietnamairlines.com gets its www), no query,
+    fragment or trailing slash. Returns None for blanks and non-URLs.
+    """
+    if not isinstance(url, str):
+        return None
+    url = url.strip()
+    if not url:
+        return None
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if not host or "." not in host:
+        return None
+    host = CANONICAL_HOSTS.get(host, host)
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, "", ""))
+
+
+def read_posts(path):
+    """Yield one posts row per spreadsheet line that has a published URL, streaming the file
+
+    Yields (row, raw_url) where row is None for lines without a usable post URL.
+    """
+    source_file = os.path.basename(path)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [unicodedata.normalize("NFC", name.strip()) for name in next(reader, [])]
+        positions = {CSV_COLUMNS[name]: index for index, name in enumerate(header) if name in CSV_COLUMNS}
+        if "source_url" not in positions:
+            raise ValueError(f"{path}: no 'Bài đăng' column in the header")
+
+        for line_number, values in enumerate(reader, start=2):
+            raw = {column: values[index].strip() if index < len(values) else "" for column, index in positions.items()}
+            source_url = normalize_post_url(raw["source_url"])
+            if source_url is None:
+                yield None, raw["source_url"]
+                continue
+            row = {column: value or None for column, value in raw.items()}
+            row.update(source_url=source_url, source_file=source_file, source_row=line_number)
+            yield row, raw["source_url"]
+
+
+def import_files(repository, paths, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, unmatched_writer=None):
+    """Stream the files into the posts table in chunks; returns a summary dict
+
+    Spreadsheet URLs are matched to images.source_url on the normalized form of both,
+    and a matched post is stored under the images' own source_url, so the two tables
+    join on that column as is. Unmatched URLs are stored normalized, counted, and
+    written to unmatched_writer when given; once images for such a post are scraped,
+    a re-import moves it to the images' source_url and deletes the normalized row.
+    Re-running is safe: rows are upserted on source_url, and a URL listed more than
+    once keeps its last row.
+    """
+    known_sources = {}
+    for summary_row in repository.progress_summary():
+        source_url = summary_row.get("source_url")
+        normalized = normalize_post_url(source_url)
+        # A source already in canonical form is preferred, so it is never taken for a stale normalized row
+        if normalized is not None and (normalized == source_url or normalized not in known_sources):
+            known_sources[normalized] = source_url
+    summary = {"rows": 0, "imported": 0, "skipped": 0, "unmatched": 0, "failed_chunks": 0, "unmatched_preview": []}
+    chunk = {}
+    # Normalized URLs of matched posts in the chunk, under which an earlier import may have stored them
+    stale = set()
+
+    def flush():
+        if not chunk:
+            return
+        try:
+            if not dry_run:
+                repository.upsert_posts(list(chunk.values()))
+                if stale:
+                    repository.delete_posts(stale)
+            summary["imported"] += len(chunk)
+        except Exception as e:
+            summary["failed_chunks"] += 1
+            print(f"Failed to upsert {len(chunk)} posts: {e}", file=sys.stderr)
+        chunk.clear()
+        stale.clear()
+
+    for path in paths:
+        for row, raw_url in read_posts(path):
+            summary["rows"] += 1
+            if row is None:
+                summary["skipped"] += 1
+                continue
+            source_url = known_sources.get(row["source_url"])
+            if source_url is not None:
+                if source_url != row["source_url"]:
+                    stale.add(row["source_url"])
+                row["source_url"] = source_url
+            else:
+                summary["unmatched"] += 1
+                if len(summary["unmatched_preview"]) < UNMATCHED_PREVIEW:
+                    summary["unmatched_preview"].append(row["source_url"])
+                if unmatched_writer:
+                    unmatched_writer.writerow([row["source_file"], row["source_row"], raw_url, row["source_url"]])
+
+            # Duplicates inside one upsert would conflict with themselves; the later line wins
+            chunk.pop(row["source_url"], None)
+            chunk[row["source_url"]] = row
+            if len(chunk) >= chunk_size:
+                flush()
+    flush()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the traffic spreadsheets in data/ into the posts table")
+    parser.add_argument("paths", nargs="*", default=["data/8-traffic-english.csv", "data/9-traffic-vietnamese.csv"])
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Parse and match without writing")
+    parser.add_argument("--unmatched-report", help="Write every URL without images to this CSV file")
+    args = parser.parse_args()
+
+    repository = create_repository()
+    report_file = open(args.unmatched_report, "w", encoding="utf-8", newline="") if args.unmatched_report else None
+    try:
+        writer = None
+        if report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(["source_file", "source_row", "post_url", "normalized_url"])
+        summary = import_files(repository, args.paths, args.chunk_size, args.dry_run, writer)
+    finally:
+        if report_file:
+            report_file.close()
+
+    print(f"{summary['rows']:,} rows read, {summary['imported']:,} posts {'checked' if args.dry_run else 'upserted'}, "
+          f"{summary['skipped']:,} without a post URL")
+    if summary["unmatched"]:
+        print(f"{summary['unmatched']:,} post URLs have no images (source_url not found):")
+        for url in summary["unmatched_preview"]:
+            print(f"  {url}")
+        if summary["unmatched"] > len(summary["unmatched_preview"]):
+            print("  ...")
+    if summary["failed_chunks"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Optional Prometheus textfile (node_exporter textfile collector format), rewritten after every rerun
+METRICS_FILE = os.environ.get("VNA_METRICS_FILE")
+
+# Rerun currently being recorded by this thread, if any
+_current_trace = contextvars.ContextVar("vna_rerun_trace", default=None)
+# Set by the wrapped loader body, which only runs on a cache miss
+_cache_miss = threading.local()
+# Body size of the last HTTP response received by this thread, set by record_response_size()
+_response_size = threading.local()
+
+
+class RerunTrace:
+    """Events recorded while one Streamlit rerun was executing"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self.events = []
+        self.lock = threading.Lock()
+
+    def add(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def summary(self):
+        """One row per call or loader: calls, hits, misses, total ms, rows and KB, slowest first"""
+        rows = {}
+        with self.lock:
+            events = list(self.events)
+        for event in events:
+            row = rows.setdefault((event["kind"], event["name"]), {
+                "kind": event["kind"], "name": event["name"], "calls": 0, "hits": 0, "misses": 0,
+                "errors": 0, "total_ms": 0.0, "rows": 0, "kb": 0.0
+            })
+            row["calls"] += 1
+            row["total_ms"] += event["seconds"] * 1000
+            row["rows"] += event.get("rows", 0)
+            row["kb"] += event.get("bytes", 0) / 1024
+            row["errors"] += event.get("error", False)
+            if event.get("cache") == "hit":
+                row["hits"] += 1
+            elif event.get("cache") == "miss":
+                row["misses"] += 1
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+
+class MetricsRegistry:
+    """Process-wide counters for Supabase calls, cached loaders and reruns"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.supabase = defaultdict(lambda: {"requests": 0, "errors": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+        self.loaders = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+        self.reruns = {"count": 0, "seconds": 0.0}
+
+    def record(self, event):
+        with self.lock:
+            if event["kind"] == "supabase":
+                counters = self.supabase[event["name"]]
+                counters["requests"] += 1
+                counters["errors"] += event.get("error", False)
+                counters["seconds"] += event["seconds"]
+                counters["rows"] += event.get("rows", 0)
+                counters["bytes"] += event.get("bytes", 0)
+            else:
+                counters = self.loaders[(event["name"], event.get("cache") or "none")]
+                counters["calls"] += 1
+                counters["seconds"] += event["seconds"]
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(event)
+
+    def record_rerun(self, trace):
+        with self.lock:
+            self.reruns["count"] += 1
+            self.reruns["seconds"] += trace.seconds
+
+    def prometheus_text(self):
+        """All counters in the Prometheus text exposition format"""
+        with self.lock:
+            supabase = {name: dict(counters) for name, counters in self.supabase.items()}
+            loaders = {key: dict(counters) for key, counters in self.loaders.items()}
+            reruns = dict(self.reruns)
+
+        lines = []
+
+        def family(metric, help_text, samples):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+
+        for field, metric, help_text in [
+            ("requests", "vna_supabase_requests_total", "Supabase requests by table/RPC and operation"),
+            ("errors", "vna_supabase_errors_total", "Supabase requests that raised"),
+            ("seconds", "vna_supabase_request_seconds_total", "Time spent waiting on Supabase requests"),
+            ("rows", "vna_supabase_rows_total", "Rows returned by Supabase requests"),
+            ("bytes", "vna_supabase_payload_bytes_total", "JSON size of the rows returned by Supabase requests"),
+        ]:
+            family(metric, help_text, [({"call": name}, counters[field]) for name, counters in sorted(supabase.items())])
+
+        for field, metric, help_text in [
+            ("calls", "vna_loader_calls_total", "Loader calls by cache outcome (hit, miss, or none for uncached loaders)"),
+            ("seconds", "vna_loader_seconds_total", "Time spent in loaders by cache outcome"),
+        ]:
+            family(metric, help_text, [
+                ({"loader": name, "cache": cache}, counters[field]) for (name, cache), counters in sorted(loaders.items())
+            ])
+
+        family("vna_reruns_total", "Streamlit reruns executed", [({}, reruns["count"])])
+        family("vna_rerun_seconds_total", "Time spent executing Streamlit reruns", [({}, reruns["seconds"])])
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=METRICS_FILE):
+        """Atomically rewrite the Prometheus textfile, if one is configured"""
+        if not path:
+            return
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def start_rerun():
+    """Begin recording a rerun on this thread and return its trace"""
+    trace = RerunTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def finish_rerun(trace):
+    trace.finish()
+    _current_trace.set(None)
+    REGISTRY.record_rerun(trace)
+
+
+def in_current_rerun(func):
+    """Wrap func so events it records on a worker thread are attributed to the caller's rerun"""
+    trace = _current_trace.get()
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        token = _current_trace.set(trace)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return run
+
+
+def record_response_size(response):
+    """httpx response hook: note the body size of the response just received on this thread
+
+    Taken from Content-Length, or from the body the client reads anyway, so measuring
+    costs no serialization of the parsed data.
+    """
+    length = response.headers.get("content-length")
+    _response_size.bytes = int(length) if length is not None else len(response.read())
+
+
+def instrumented_cache(cache, **cache_options):
+    """Drop-in for cache(**cache_options) that records timing and hit/miss of every call
+
+    The cached body only runs on a miss, so it flags the miss for the outer wrapper.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _cache_miss.flag = True
+            return func(*args, **kwargs)
+
+        cached = cache(**cache_options)(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            outer_flag = getattr(_cache_miss, "flag", False)
+            _cache_miss.flag = False
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                miss = _cache_miss.flag
+                _cache_miss.flag = outer_flag
+                REGISTRY.record({
+                    "kind": "loader", "name": func.__name__,
+                    "seconds": time.perf_counter() - start, "cache": "miss" if miss else "hit"
+                })
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
+
+def instrumented_loader(func):
+    """Record timing of every call of an uncached loader"""
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            REGISTRY.record({"kind": "loader", "name": func.__name__, "seconds": time.perf_counter() - start})
+    return call
+
+
+class InstrumentedClient:
+    """Wraps a supabase client so every executed request is timed and counted"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        self._hook_responses()
+        return _InstrumentedRequest(self._client.table(name), name, None)
+
+    def rpc(self, name, params=None, **kwargs):
+        self._hook_responses()
+        return _InstrumentedRequest(self._client.rpc(name, params or {}, **kwargs), "rpc", name)
+
+    def _hook_responses(self):
+        # The supabase client rebuilds its PostgREST session on auth changes, so check every time
+        session = getattr(getattr(self._client, "postgrest", None), "session", None)
+        hooks = getattr(session, "event_hooks", None)
+        if hooks is not None and record_response_size not in hooks["response"]:
+            hooks["response"] = [*hooks["response"], record_response_size]
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _InstrumentedRequest:
+    """Proxy over a postgrest request builder that records the request when it is executed"""
+
+    OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+
+    def __init__(self, builder, table, operation):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def execute(self):
+        start = time.perf_counter()
+        error = False
+        data = None
+        _response_size.bytes = 0  # stays 0 for clients without an HTTP layer (e.g. the fake)
+        try:
+            response = self._builder.execute()
+            data = response.data
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            rows = len(data) if isinstance(data, list) else int(data is not None)
+            REGISTRY.record({
+                "kind": "supabase", "name": f"{self._table}.{self._operation or 'select'}",
+                "seconds": time.perf_counter() - start, "rows": rows,
+                "bytes": _response_size.bytes, "error": error
+            })
+
+    def __getattr__(self, name):
+        attribute = getattr(self._builder, name)
+        operation = name if name in self.OPERATIONS and self._table != "rpc" else self._operation
+        if callable(attribute):
+            @functools.wraps(attribute)
+            def chained(*args, **kwargs):
+                result = attribute(*args, **kwargs)
+                return _InstrumentedRequest(result, self._table, operation) if hasattr(result, "execute") else result
+            return chained
+        # Properties such as not_ return the builder itself
+        return _InstrumentedRequest(attribute, self._table, operation) if hasattr(attribute, "execute") else attribute
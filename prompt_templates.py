@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import string
+
+import numpy as np
+import pandas as pd
+
+from compact_frames import ARROW_STRING
+
+# Sections of a prompt spec, as in prompt.json: what to change in the image and what to keep
+PROMPT_SECTIONS = ("change", "keep")
+
+# The example spec in the repository, offered as the starting template
+EXAMPLE_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt.json")
+
+# Private-use marker around the number of each value in the JSON layout of a template
+_SLOT = re.compile("\ue000(\\d+)\ue000")
+
+
+def parse_template(text):
+    """Parse and validate a prompt template: a prompt.json-style spec whose values may hold {field} placeholders
+
+    Raises ValueError with a message fit for the user when the spec is malformed.
+    """
+    try:
+        template = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Template is not valid JSON: {e}")
+
+    if not isinstance(template, dict) or not template:
+        raise ValueError(f"Template must be an object with {' and/or '.join(PROMPT_SECTIONS)} sections")
+    for section, entries in template.items():
+        if section not in PROMPT_SECTIONS:
+            raise ValueError(f"Unknown section '{section}'; expected {', '.join(PROMPT_SECTIONS)}")
+        if not isinstance(entries, dict):
+            raise ValueError(f"Section '{section}' must map names to text")
+        for name, value in entries.items():
+            if not isinstance(value, str):
+                raise ValueError(f"'{section}.{name}' must be text")
+            _placeholders(value, f"{section}.{name}")
+    return template
+
+
+def template_fields(template):
+    """Names of the fields the template substitutes, in order of first use"""
+    fields = []
+    for section, entries in template.items():
+        for name, value in entries.items():
+            for _, field in _placeholders(value, f"{section}.{name}"):
+                if field is not None and field not in fields:
+                    fields.append(field)
+    return fields
+
+
+def render_prompts(template, frame):
+    """Render the template for every row of frame in one vectorized pass
+
+    Returns a Series of prompt texts aligned with frame, laid out like prompt.json.
+    Substituted values are JSON-escaped once per distinct value, and the pieces are
+    joined column-wise with Arrow string kernels, so the cost hardly depends on the
+    number of rows. Missing values render as empty text.
+    """
+    missing = [field for field in template_fields(template) if field not in frame.columns]
+    if missing:
+        raise ValueError(f"Unknown field(s) {', '.join(missing)}; available: {', '.join(frame.columns)}")
+
+    escaped = {field: _escaped_column(frame[field]) for field in template_fields(template)}
+    result = None
+    for piece, is_field in _compile(template):
+        column = escaped[piece] if is_field else piece
+        result = column if result is None else result + column
+    if isinstance(result, str):
+        # No placeholders at all: every row gets the same prompt
+        return pd.Series(result, index=frame.index, dtype=ARROW_STRING)
+    return result
+
+
+def load_example_spec():
+    """Text of prompt.json, or an empty spec when it is not there"""
+    try:
+        with open(EXAMPLE_SPEC_PATH, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return json.dumps({section: {} for section in PROMPT_SECTIONS}, indent=4)
+
+
+def _placeholders(value, where):
+    """(literal, field) pairs of a template value; field is None after the last literal"""
+    try:
+        parsed = list(string.Formatter().parse(value))
+    except ValueError as e:
+        raise ValueError(f"'{where}': {e} (write {{{{ and }}}} for literal braces)")
+    for _, field, format_spec, conversion in parsed:
+        if field is None:
+            continue
+        if not field.isidentifier() or format_spec or conversion:
+            raise ValueError(f"'{where}': placeholders must be plain field names like {{image_title}}, got {{{field}}}")
+    return [(literal, field) for literal, field, _, _ in parsed]
+
+
+def _compile(template):
+    """The rendered prompt as a list of (text, False) literal pieces and (field, True) slots"""
+    values = []
+    skeleton = {}
+    for section, entries in template.items():
+        skeleton[section] = {}
+        for name, value in entries.items():
+            skeleton[section][name] = f"\ue000{len(values)}\ue000"
+            values.append(value)
+
+    # Lay out the JSON once with markers where the values go, then fill each marker
+    pieces = []
+    for i, part in enumerate(_SLOT.split(json.dumps(skeleton, ensure_ascii=False, indent=4))):
+        if i % 2 == 0:
+            pieces.append((part, False))
+            continue
+        for literal, field in _placeholders(values[int(part)], "template"):
+            pieces.append((_escape(literal), False))
+            if field is not None:
+                pieces.append((field, True))
+
+    # Adjacent literals become one piece, so each row pays one concatenation per slot
+    merged = []
+    for piece, is_field in pieces:
+        if not is_field and merged and not merged[-1][1]:
+            merged[-1] = (merged[-1][0] + piece, False)
+        elif is_field or piece:
+            merged.append((piece, is_field))
+    return merged
+
+
+def _escape(text):
+    """text as it appears inside a JSON string literal"""
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+def _escaped_column(series):
+    codes, uniques = pd.factorize(series)
+    # Code -1 (missing value) picks the trailing empty string
+    escaped = np.array([_escape(str(value)) for value in uniques] + [""], dtype=object)
+    return pd.Series(escaped[codes], index=series.index, dtype=ARROW_STRING)
@@ -0,0 +1,351 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Local journal of review edits not yet written to Supabase
+REVIEW_JOURNAL_PATH = os.environ.get("VNA_REVIEW_JOURNAL", ".review_journal.sqlite3")
+
+# Flush queued edits every FLUSH_INTERVAL seconds, or as soon as FLUSH_BATCH_SIZE records are waiting
+FLUSH_INTERVAL = float(os.environ.get("VNA_FLUSH_INTERVAL", "5"))
+FLUSH_BATCH_SIZE = 50
+# A record that fails this many flushes in a row is moved to the failed list instead of being retried;
+# retries back off exponentially from FLUSH_INTERVAL up to FLUSH_MAX_BACKOFF seconds
+FLUSH_MAX_ATTEMPTS = 8
+FLUSH_MAX_BACKOFF = 300
+
+
+class ReviewJournal:
+    """Append-only SQLite log of review edits, so edits survive browser refreshes and server restarts
+
+    Record ids and field values are stored as JSON to keep their types across a replay.
+    Edits that could not be saved are moved to a separate review_failed table.
+    """
+
+    def __init__(self, path=REVIEW_JOURNAL_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS review_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                record_id TEXT NOT NULL,
+                changes TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS review_failed (
+                seq INTEGER PRIMARY KEY,
+                record_id TEXT NOT NULL,
+                changes TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL
+            )
+        """)
+
+    def append(self, record_id, changes):
+        """Durably record one edit and return its sequence number"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO review_journal (record_id, changes, created_at) VALUES (?, ?, ?)",
+                (json.dumps(record_id), json.dumps(changes), time.time())
+            )
+            return cursor.lastrowid
+
+    def entries(self):
+        """All unflushed edits as (seq, record_id, changes), oldest first"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT seq, record_id, changes FROM review_journal ORDER BY seq"
+            ).fetchall()
+        return [(seq, json.loads(record_id), json.loads(changes)) for seq, record_id, changes in rows]
+
+    def discard(self, flushed):
+        """Drop edits that reached the database; flushed is [(record_id, newest seq saved)]"""
+        with self.lock:
+            self.connection.executemany(
+                "DELETE FROM review_journal WHERE record_id = ? AND seq <= ?",
+                [(json.dumps(record_id), seq) for record_id, seq in flushed]
+            )
+
+    def fail(self, failures):
+        """Move every edit of the given records to the failed table; failures is [(record_id, error)]"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                for record_id, error in failures:
+                    key = json.dumps(record_id)
+                    self.connection.execute(
+                        "INSERT INTO review_failed (seq, record_id, changes, created_at, error, failed_at) "
+                        "SELECT seq, record_id, changes, created_at, ?, ? FROM review_journal WHERE record_id = ?",
+                        (error, time.time(), key)
+                    )
+                    self.connection.execute("DELETE FROM review_journal WHERE record_id = ?", (key,))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def failed_entries(self):
+        """All failed edits as (seq, record_id, changes, error), oldest first"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT seq, record_id, changes, error FROM review_failed ORDER BY seq"
+            ).fetchall()
+        return [(seq, json.loads(record_id), json.loads(changes), error) for seq, record_id, changes, error in rows]
+
+    def restore(self, record_ids):
+        """Move the failed edits of these records back into the journal; returns their new (seq, record_id, changes)"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                restored = []
+                for record_id in record_ids:
+                    key = json.dumps(record_id)
+                    rows = self.connection.execute(
+                        "SELECT changes, created_at FROM review_failed WHERE record_id = ? ORDER BY seq", (key,)
+                    ).fetchall()
+                    for changes, created_at in rows:
+                        cursor = self.connection.execute(
+                            "INSERT INTO review_journal (record_id, changes, created_at) VALUES (?, ?, ?)",
+                            (key, changes, created_at)
+                        )
+                        restored.append((cursor.lastrowid, record_id, json.loads(changes)))
+                    self.connection.execute("DELETE FROM review_failed WHERE record_id = ?", (key,))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return restored
+
+    def drop_failed(self, record_ids):
+        """Give up on the failed edits of these records"""
+        with self.lock:
+            self.connection.executemany(
+                "DELETE FROM review_failed WHERE record_id = ?", [(json.dumps(record_id),) for record_id in record_ids]
+            )
+
+
+class WriteBehindQueue:
+    """Coalesces journaled edits per record and saves them in batches on a background worker
+
+    save(changes_by_id) must return {record_id: (success, error)} like save_records();
+    on_saved(saved_changes) runs after each flush with the edits that were written.
+    Failed records stay queued and are retried with exponential backoff; after
+    max_attempts failures in a row they are moved to the failed list, where they wait
+    for retry_failed() or discard_failed(). Edits left in the journal by a previous
+    process are loaded on start and flushed first.
+
+    The queue is shared by every session in the process; the record_ids arguments
+    scope counts, errors and flushes to the records one session edited.
+    """
+
+    def __init__(self, journal, save, on_saved=None, interval=FLUSH_INTERVAL, batch_size=FLUSH_BATCH_SIZE,
+                 max_attempts=FLUSH_MAX_ATTEMPTS, max_backoff=FLUSH_MAX_BACKOFF):
+        self.journal = journal
+        self.save = save
+        self.on_saved = on_saved
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time, worker or on demand
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        # In-memory mirror of the journal: merged changes and newest seq per record
+        self._pending = {}
+        self._newest_seq = {}
+        for seq, record_id, changes in journal.entries():
+            self._pending.setdefault(record_id, {}).update(changes)
+            self._newest_seq[record_id] = seq
+        self.replayed = len(self._pending)
+
+        # Failed saves of queued records: attempts so far, last error, and when to try again
+        self._attempts = {}
+        self._errors = {}
+        self._retry_at = {}
+
+        # Records that ran out of attempts: merged changes and the last error
+        self._failed = {}
+        for seq, record_id, changes, error in journal.failed_entries():
+            entry = self._failed.setdefault(record_id, {"changes": {}, "error": None})
+            entry["changes"].update(changes)
+            entry["error"] = error
+
+        self.flushed = 0
+        self.failed = 0
+        self.last_error = None
+        self.last_flush_at = None
+
+        self._worker = threading.Thread(target=self._run, name="review-write-behind", daemon=True)
+        self._worker.start()
+        if self._pending:
+            self._wake.set()
+
+    def enqueue(self, record_id, changes):
+        """Journal an edit and queue it; flushing is triggered early once the batch is full"""
+        with self.lock:
+            seq = self.journal.append(record_id, changes)
+            self._pending.setdefault(record_id, {}).update(changes)
+            self._newest_seq[record_id] = seq
+            # A new edit may be what fixes the record: try it at the next flush
+            self._retry_at.pop(record_id, None)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def pending(self, record_id):
+        """Queued changes for one record that have not been saved yet"""
+        with self.lock:
+            return dict(self._pending.get(record_id, {}))
+
+    def pending_count(self, record_ids=None):
+        """Records waiting to be saved, among record_ids when given"""
+        with self.lock:
+            if record_ids is None:
+                return len(self._pending)
+            return sum(1 for record_id in record_ids if record_id in self._pending)
+
+    def errors(self, record_ids):
+        """{record_id: error} for those of record_ids whose last save attempt failed and that will be retried"""
+        with self.lock:
+            return {record_id: self._errors[record_id] for record_id in record_ids if record_id in self._errors}
+
+    def failed_records(self, record_ids=None):
+        """{record_id: {"changes", "error"}} of records moved to the failed list, among record_ids when given"""
+        with self.lock:
+            return {
+                record_id: {"changes": dict(entry["changes"]), "error": entry["error"]}
+                for record_id, entry in self._failed.items()
+                if record_ids is None or record_id in record_ids
+            }
+
+    def retry_failed(self, record_ids):
+        """Queue the failed edits of these records again, with a fresh attempt count"""
+        with self.lock:
+            record_ids = [record_id for record_id in record_ids if record_id in self._failed]
+            for seq, record_id, changes in self.journal.restore(record_ids):
+                # Edits queued after the failure are newer and win over the restored ones
+                merged = dict(changes)
+                merged.update(self._pending.get(record_id, {}))
+                self._pending[record_id] = merged
+                self._newest_seq[record_id] = max(seq, self._newest_seq.get(record_id, 0))
+            for record_id in record_ids:
+                del self._failed[record_id]
+        self._wake.set()
+
+    def discard_failed(self, record_ids):
+        """Give up on the failed edits of these records"""
+        with self.lock:
+            record_ids = [record_id for record_id in record_ids if record_id in self._failed]
+            self.journal.drop_failed(record_ids)
+            for record_id in record_ids:
+                del self._failed[record_id]
+
+    def flush(self, record_ids=None, due_only=False):
+        """Save the queued records (those among record_ids when given) and return {record_id: (success, error)}
+
+        due_only skips records still backing off from a failed attempt; the worker uses it,
+        an explicit save does not.
+        """
+        with self._flush_lock:
+            now = time.time()
+            with self.lock:
+                candidates = self._pending if record_ids is None else [
+                    record_id for record_id in record_ids if record_id in self._pending
+                ]
+                batch = {
+                    record_id: dict(self._pending[record_id]) for record_id in candidates
+                    if not due_only or self._retry_at.get(record_id, 0) <= now
+                }
+                seqs = {record_id: self._newest_seq[record_id] for record_id in batch}
+            if not batch:
+                return {}
+
+            try:
+                results = self.save(batch)
+            except Exception as e:
+                results = {record_id: (False, str(e)) for record_id in batch}
+            saved = {record_id: batch[record_id] for record_id, (success, _) in results.items() if success}
+
+            with self.lock:
+                self.journal.discard([(record_id, seqs[record_id]) for record_id in saved])
+                for record_id in saved:
+                    self._attempts.pop(record_id, None)
+                    self._errors.pop(record_id, None)
+                    self._retry_at.pop(record_id, None)
+                    # Edits queued while this flush was running stay pending
+                    if self._newest_seq.get(record_id) == seqs[record_id]:
+                        del self._pending[record_id]
+                        del self._newest_seq[record_id]
+
+                exhausted = []
+                for record_id, (success, error) in results.items():
+                    if success or record_id not in self._pending:
+                        continue
+                    attempts = self._attempts.get(record_id, 0) + 1
+                    if attempts >= self.max_attempts:
+                        exhausted.append((record_id, error))
+                        continue
+                    self._attempts[record_id] = attempts
+                    self._errors[record_id] = error
+                    self._retry_at[record_id] = now + min(self.interval * 2 ** attempts, self.max_backoff)
+
+                # Out of attempts: the record leaves the queue for the failed list, edits and all
+                if exhausted:
+                    self.journal.fail(exhausted)
+                for record_id, error in exhausted:
+                    entry = self._failed.setdefault(record_id, {"changes": {}, "error": None})
+                    entry["changes"].update(self._pending.pop(record_id))
+                    entry["error"] = error
+                    del self._newest_seq[record_id]
+                    for state in (self._attempts, self._errors, self._retry_at):
+                        state.pop(record_id, None)
+
+                self.flushed += len(saved)
+                self.failed += len(batch) - len(saved)
+                errors = [error for success, error in results.values() if not success]
+                self.last_error = errors[0] if errors else None
+                self.last_flush_at = time.time()
+
+            if saved and self.on_saved:
+                try:
+                    self.on_saved(saved)
+                except Exception as e:
+                    self.last_error = str(e)
+            return results
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pending": len(self._pending),
+                "failed_records": len(self._failed),
+                "flushed": self.flushed,
+                "failed": self.failed,
+                "replayed": self.replayed,
+                "last_error": self.last_error,
+                "last_flush_at": self.last_flush_at
+            }
+
+    def stop(self):
+        """Stop the worker after a final flush"""
+        self._stopped.set()
+        self._wake.set()
+        self._worker.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush(due_only=True)
+            except Exception as e:
+                self.last_error = str(e)
+        self.flush()
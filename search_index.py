@@ -0,0 +1,127 @@
+import re
+import unicodedata
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Share of the query's trigrams a document must contain to count as a match
+MIN_TRIGRAM_COVERAGE = 0.5
+# Extra score when a query word appears as a whole word in the document
+TOKEN_MATCH_WEIGHT = 0.5
+# Extra score when the whole query appears as a phrase (checked on the best candidates only)
+PHRASE_MATCH_WEIGHT = 1.0
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold_text(text):
+    """Lowercase, strip Vietnamese diacritics and turn punctuation into spaces: 'Hà Nội' -> 'ha noi'"""
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    if not text.isascii():
+        text = text.replace("đ", "d")
+        text = "".join(ch for ch in unicodedata.normalize("NFD", text) if unicodedata.category(ch) != "Mn")
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def word_trigrams(word):
+    """pg_trgm-style trigrams of one word, padded with two leading spaces and one trailing space"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigrams(folded):
+    grams = set()
+    for word in folded.split():
+        grams |= word_trigrams(word)
+    return grams
+
+
+def url_search_text(url):
+    """Searchable part of a post URL: the path slug words, without scheme and host"""
+    if not isinstance(url, str):
+        return ""
+    parts = urlsplit(url)
+    return parts.path if parts.netloc else url
+
+
+class PostSearchIndex:
+    """Trigram and word index over post URLs and image titles, returning ranked top-K matches"""
+
+    def __init__(self, keys, texts):
+        self.keys = list(keys)
+        self._texts = []
+        trigram_postings = defaultdict(list)
+        token_postings = defaultdict(list)
+        word_grams = {}  # slugs reuse the same words heavily
+
+        for doc_id, text in enumerate(texts):
+            folded = fold_text(text)
+            self._texts.append(f" {folded} ")
+            words = set(folded.split())
+            grams = set()
+            for word in words:
+                if word not in word_grams:
+                    word_grams[word] = word_trigrams(word)
+                grams |= word_grams[word]
+                token_postings[word].append(doc_id)
+            for gram in grams:
+                trigram_postings[gram].append(doc_id)
+
+        self._trigrams = {gram: np.array(ids, dtype=np.int32) for gram, ids in trigram_postings.items()}
+        self._tokens = {token: np.array(ids, dtype=np.int32) for token, ids in token_postings.items()}
+
+    def search(self, query, limit=20):
+        """Return ([(key, score), ...] best first, total number of matches)"""
+        folded = fold_text(query)
+        grams = trigrams(folded)
+        if not grams or not self.keys:
+            return [], 0
+
+        # Fraction of the query's trigrams present in each document
+        hits = [self._trigrams[gram] for gram in grams if gram in self._trigrams]
+        if not hits:
+            return [], 0
+        coverage = np.bincount(np.concatenate(hits), minlength=len(self.keys)) / len(grams)
+
+        words = folded.split()
+        word_hits = [self._tokens[word] for word in words if word in self._tokens]
+        if word_hits:
+            word_share = np.bincount(np.concatenate(word_hits), minlength=len(self.keys)) / len(words)
+        else:
+            word_share = 0
+
+        scores = np.where(coverage >= MIN_TRIGRAM_COVERAGE, coverage + TOKEN_MATCH_WEIGHT * word_share, 0)
+        matches = np.flatnonzero(scores)
+        total = len(matches)
+
+        # Shortlist, then reward documents containing the query as a phrase
+        shortlist = limit * 4
+        if len(matches) > shortlist:
+            matches = matches[np.argpartition(-scores[matches], shortlist - 1)[:shortlist]]
+        phrase = f" {folded} "
+        for i in matches:
+            if phrase in self._texts[i]:
+                scores[i] += PHRASE_MATCH_WEIGHT
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+
+        # Best score first; ties keep the index order (posts with more images first)
+        matches = matches[np.lexsort((matches, -scores[matches]))]
+        return [(self.keys[i], float(scores[i])) for i in matches], total
+
+
+def build_post_search_index(posts_df, images_df):
+    """Index each post by its URL slug plus the titles of its images"""
+    titles = {}
+    if not images_df.empty and 'image_title' in images_df.columns:
+        titled = images_df.dropna(subset=['image_title'])
+        titles = titled.groupby('source_url', sort=False, observed=True)['image_title'].agg(lambda values: " ".join(set(values))).to_dict()
+
+    texts = [
+        f"{url_search_text(url)} {titles.get(url, '')}"
+        for url in posts_df['source_url']
+    ]
+    return PostSearchIndex(posts_df['source_url'], texts)
@@ -24,6 +24,8 @@ ADD COLUMN IF NOT EXISTS reviewed_by UUID REFERENCES users(id);
 -- 3. Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_images_assigned_to ON images(assigned_to);
 CREATE INDEX IF NOT EXISTS idx_images_source_url ON images(source_url);
+-- Browse Data pages seek on the (source_url, id) key; this index makes each seek a range scan
+CREATE INDEX IF NOT EXISTS idx_images_source_url_id ON images(source_url, id);
 CREATE INDEX IF NOT EXISTS idx_images_status ON images(image_status);
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active);
@@ -104,21 +106,46 @@ CREATE POLICY "Admins can assign images" ON images
     );
 
 -- 8. Create useful views for reporting
+-- Materialized so dashboard reads cost the same however large images grows; they are
+-- refreshed concurrently on a schedule (section 14), so readers are never blocked.
+-- Plain views from earlier versions of this script are replaced, and the materialized
+-- views are dropped and recreated so a re-run picks up changed definitions.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'public' AND viewname = 'progress_overview') THEN
+        DROP VIEW progress_overview;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'public' AND viewname = 'user_progress') THEN
+        DROP VIEW user_progress;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_views WHERE schemaname = 'public' AND viewname = 'source_progress') THEN
+        DROP VIEW source_progress;
+    END IF;
+END $$;
 
--- Overall progress view
-CREATE OR REPLACE VIEW progress_overview AS
+-- Overall progress view (one row, from a single scan of images)
+DROP MATERIALIZED VIEW IF EXISTS progress_overview CASCADE;
+CREATE MATERIALIZED VIEW progress_overview AS
 SELECT
-    (SELECT COUNT(*) FROM images) as total_images,
-    (SELECT COUNT(*) FROM images WHERE assigned_to IS NOT NULL) as assigned_images,
-    (SELECT COUNT(*) FROM images WHERE assigned_to IS NULL) as unassigned_images,
-    (SELECT COUNT(*) FROM images WHERE prompt IS NOT NULL AND prompt != '') as completed_images,
-    (SELECT COUNT(*) FROM images WHERE prompt IS NULL OR prompt = '') as pending_images,
-    (SELECT ROUND(
-        (COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') * 100.0) / COUNT(*), 2
-    ) FROM images) as completion_percentage;
+    COUNT(*) as total_images,
+    COUNT(*) FILTER (WHERE assigned_to IS NOT NULL) as assigned_images,
+    COUNT(*) FILTER (WHERE assigned_to IS NULL) as unassigned_images,
+    COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') as completed_images,
+    COUNT(*) FILTER (WHERE prompt IS NULL OR prompt = '') as pending_images,
+    COUNT(*) FILTER (WHERE image_status = true) as valid_images,
+    COUNT(*) FILTER (WHERE image_status = false) as invalid_images,
+    COUNT(DISTINCT source_url) as total_sources,
+    CASE
+        WHEN COUNT(*) > 0 THEN
+            ROUND((COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') * 100.0) / COUNT(*), 2)
+        ELSE 0
+    END as completion_percentage,
+    NOW() as refreshed_at
+FROM images;
 
 -- User progress view
-CREATE OR REPLACE VIEW user_progress AS
+DROP MATERIALIZED VIEW IF EXISTS user_progress CASCADE;
+CREATE MATERIALIZED VIEW user_progress AS
 SELECT
     u.id,
     u.username,
@@ -139,21 +166,464 @@ WHERE u.is_active = true
 GROUP BY u.id, u.username, u.role;
 
 -- Source progress view
-CREATE OR REPLACE VIEW source_progress AS
+DROP MATERIALIZED VIEW IF EXISTS source_progress CASCADE;
+CREATE MATERIALIZED VIEW source_progress AS
 SELECT
     source_url,
     COUNT(*) as total_images,
     COUNT(*) FILTER (WHERE assigned_to IS NOT NULL) as assigned_images,
     COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') as completed_images,
+    COUNT(*) FILTER (WHERE image_status = true) as valid_images,
+    COUNT(*) FILTER (WHERE image_status = false) as invalid_images,
     ROUND(
         (COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') * 100.0) / COUNT(*), 2
     ) as completion_percentage
 FROM images
-GROUP BY source_url
-ORDER BY completion_percentage DESC;
+GROUP BY source_url;
+
+-- REFRESH ... CONCURRENTLY needs a unique index covering every row
+CREATE UNIQUE INDEX IF NOT EXISTS idx_progress_overview_refreshed ON progress_overview(refreshed_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_progress_id ON user_progress(id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_source_progress_source ON source_progress(source_url);
+CREATE INDEX IF NOT EXISTS idx_source_progress_total ON source_progress(total_images DESC);
 
 COMMENT ON TABLE users IS 'User accounts for image review system';
 COMMENT ON TABLE images IS 'Image metadata with assignment tracking';
-COMMENT ON VIEW progress_overview IS 'Overall project progress statistics';
-COMMENT ON VIEW user_progress IS 'Individual user progress statistics';
-COMMENT ON VIEW source_progress IS 'Progress statistics by source URL';
\ No newline at end of file
+COMMENT ON MATERIALIZED VIEW progress_overview IS 'Overall project progress statistics';
+COMMENT ON MATERIALIZED VIEW user_progress IS 'Individual user progress statistics';
+COMMENT ON MATERIALIZED VIEW source_progress IS 'Progress statistics by source URL';
+
+-- 9. Aggregate endpoint for the progress dashboard
+-- Returns one row per source as a JSON array so the whole dashboard is served by a
+-- single RPC call (a JSON scalar is not subject to PostgREST's max-rows cap).
+-- Overall totals are the column sums of the per-source rows.
+CREATE OR REPLACE FUNCTION get_progress_summary()
+RETURNS json AS $$
+    SELECT COALESCE(json_agg(s ORDER BY s.total_images DESC), '[]'::json)
+    FROM (
+        SELECT
+            source_url,
+            COUNT(*) as total_images,
+            COUNT(*) FILTER (WHERE prompt IS NOT NULL AND prompt != '') as completed_images,
+            COUNT(*) FILTER (WHERE image_status = true) as valid_images,
+            COUNT(*) FILTER (WHERE image_status = false) as invalid_images
+        FROM images
+        GROUP BY source_url
+    ) s;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_progress_summary() IS 'Per-source progress counters for the dashboard in a single call';
+
+-- 10. Change tracking on images for incremental (delta) sync
+-- The app keeps a local snapshot of images and only fetches rows with updated_at
+-- at or after the newest value it has already seen.
+ALTER TABLE images
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_images_updated_at ON images(updated_at);
+
+DROP TRIGGER IF EXISTS update_images_updated_at ON images;
+CREATE TRIGGER update_images_updated_at
+    BEFORE UPDATE ON images
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- 11. Indexed, accent-insensitive search over image titles and alt text
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() is only STABLE; this IMMUTABLE wrapper lets it be used in generated columns and indexes.
+-- It names the function and dictionary by the schema the extension was installed in
+-- (extensions on Supabase, public elsewhere), since search_path is not fixed at index time.
+DO $$
+DECLARE
+    unaccent_schema TEXT := (
+        SELECT n.nspname
+        FROM pg_extension e
+        JOIN pg_namespace n ON n.oid = e.extnamespace
+        WHERE e.extname = 'unaccent'
+    );
+BEGIN
+    EXECUTE format(
+        'CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS %L '
+        'LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT',
+        format('SELECT %I.unaccent(%L::regdictionary, $1)', unaccent_schema, quote_ident(unaccent_schema) || '.unaccent')
+    );
+
+    -- Text search configuration for Vietnamese: no stemming, diacritics removed ('Hà Nội' -> 'ha noi')
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'vietnamese_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION vietnamese_unaccent (COPY = simple);
+        EXECUTE format(
+            'ALTER TEXT SEARCH CONFIGURATION vietnamese_unaccent '
+            'ALTER MAPPING FOR hword, hword_part, word WITH %I.unaccent, simple',
+            unaccent_schema
+        );
+    END IF;
+END $$;
+
+ALTER TABLE images
+ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+    lower(immutable_unaccent(coalesce(image_title, '') || ' ' || coalesce(image_alt, '')))
+) STORED,
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('vietnamese_unaccent', coalesce(image_title, '') || ' ' || coalesce(image_alt, ''))
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_images_search_vector ON images USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_images_search_text_trgm ON images USING GIN (search_text gin_trgm_ops);
+
+-- Matches whole words through the tsvector and substrings through the trigram index, ranked best first
+CREATE OR REPLACE FUNCTION search_images(
+    search_query TEXT,
+    status_filter BOOLEAN DEFAULT NULL,
+    page_size INTEGER DEFAULT 100,
+    page_offset INTEGER DEFAULT 0
+)
+RETURNS SETOF images AS $$
+    SELECT i.*
+    FROM images i,
+        websearch_to_tsquery('vietnamese_unaccent', search_query) AS q,
+        lower(immutable_unaccent(search_query)) AS t
+    WHERE (status_filter IS NULL OR i.image_status = status_filter)
+      AND (
+        i.search_vector @@ q
+        OR i.search_text LIKE '%' || replace(replace(replace(t, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+      )
+    ORDER BY ts_rank(i.search_vector, q) DESC, word_similarity(t, i.search_text) DESC, i.id
+    LIMIT page_size OFFSET page_offset;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_images_count(
+    search_query TEXT,
+    status_filter BOOLEAN DEFAULT NULL
+)
+RETURNS BIGINT AS $$
+    SELECT COUNT(*)
+    FROM images i,
+        websearch_to_tsquery('vietnamese_unaccent', search_query) AS q,
+        lower(immutable_unaccent(search_query)) AS t
+    WHERE (status_filter IS NULL OR i.image_status = status_filter)
+      AND (
+        i.search_vector @@ q
+        OR i.search_text LIKE '%' || replace(replace(replace(t, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+      );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION search_images(TEXT, BOOLEAN, INTEGER, INTEGER) IS 'Ranked, paginated image search over title and alt text';
+
+-- 12. Editorial plan (posts) imported from the traffic spreadsheets by import_traffic.py
+-- One row per published post; source_url matches images.source_url, so progress can be
+-- broken down by keyword, province and editor with a join on that column.
+CREATE TABLE IF NOT EXISTS posts (
+    source_url TEXT PRIMARY KEY,
+    keyword TEXT,
+    province TEXT,
+    editor TEXT,
+    status TEXT,
+    draft_url TEXT,
+    source_file TEXT,
+    source_row INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_posts_province ON posts(province);
+CREATE INDEX IF NOT EXISTS idx_posts_editor ON posts(editor);
+
+DROP TRIGGER IF EXISTS update_posts_updated_at ON posts;
+CREATE TRIGGER update_posts_updated_at
+    BEFORE UPDATE ON posts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Everyone can read the plan; only admins import it (the importer upserts, so it needs
+-- INSERT and UPDATE)
+ALTER TABLE posts ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view all posts" ON posts FOR SELECT USING (true);
+
+CREATE POLICY "Only admins can modify posts" ON posts
+    FOR ALL USING (
+        EXISTS (
+            SELECT 1 FROM users u
+            WHERE u.id = auth.uid() AND u.role = 'admin' AND u.is_active = true
+        )
+    );
+
+-- 13. Set-based assignment of unassigned images to reviewers
+-- Each source (post) goes to a single reviewer. A source whose assigned images all belong
+-- to one of the selected reviewers gets its remaining images assigned to that reviewer; a
+-- source owned by someone else (not selected, inactive, or several owners) is skipped, so
+-- it is never split. Sources with no owner are dealt out largest first in snake order
+-- (1..n, n..1, ...) over the reviewers sorted by open images, which approximates giving
+-- each one to the least loaded reviewer. The plan is one statement over the per-source
+-- counts and is written with one UPDATE. Defaults to all active users with the reviewer role.
+CREATE OR REPLACE FUNCTION assign_images(reviewer_ids UUID[] DEFAULT NULL)
+RETURNS TABLE (user_id UUID, username VARCHAR, assigned_sources BIGINT, newly_assigned BIGINT, open_images BIGINT)
+AS $$
+#variable_conflict use_column
+DECLARE
+    reviewers UUID[];
+BEGIN
+    -- Concurrent runs would both see the same images as unassigned
+    PERFORM pg_advisory_xact_lock(hashtext('assign_images'));
+
+    SELECT array_agg(u.id ORDER BY u.username)
+    INTO reviewers
+    FROM users u
+    WHERE u.is_active
+      AND CASE WHEN reviewer_ids IS NULL THEN u.role = 'reviewer' ELSE u.id = ANY(reviewer_ids) END;
+
+    IF reviewers IS NULL THEN
+        RETURN;
+    END IF;
+
+    WITH sources AS (
+        SELECT
+            source_url,
+            COUNT(*) FILTER (WHERE assigned_to IS NULL) AS unassigned,
+            COUNT(DISTINCT assigned_to) AS owners,
+            (array_agg(assigned_to) FILTER (WHERE assigned_to IS NOT NULL))[1] AS owner
+        FROM images
+        WHERE source_url IS NOT NULL
+        GROUP BY source_url
+        HAVING COUNT(*) FILTER (WHERE assigned_to IS NULL) > 0
+    ),
+    kept AS (
+        SELECT source_url, owner AS user_id, unassigned
+        FROM sources
+        WHERE owners = 1 AND owner = ANY(reviewers)
+    ),
+    -- Open images per reviewer once the sources they keep are topped up, least loaded first
+    slots AS (
+        SELECT r.id, row_number() OVER (ORDER BY COALESCE(o.open_images, 0) + COALESCE(k.unassigned, 0), r.id) - 1 AS slot
+        FROM unnest(reviewers) AS r(id)
+        LEFT JOIN (
+            SELECT assigned_to, COUNT(*) AS open_images
+            FROM images
+            WHERE assigned_to = ANY(reviewers) AND (prompt IS NULL OR prompt = '')
+            GROUP BY assigned_to
+        ) o ON o.assigned_to = r.id
+        LEFT JOIN (SELECT user_id, SUM(unassigned) AS unassigned FROM kept GROUP BY user_id) k ON k.user_id = r.id
+    ),
+    unowned AS (
+        SELECT source_url, row_number() OVER (ORDER BY unassigned DESC, source_url) - 1 AS position
+        FROM sources
+        WHERE owners = 0
+    ),
+    plan AS (
+        SELECT source_url, user_id FROM kept
+        UNION ALL
+        SELECT u.source_url, s.id
+        FROM unowned u
+        JOIN slots s ON s.slot = CASE
+            WHEN (u.position / cardinality(reviewers)) % 2 = 0 THEN u.position % cardinality(reviewers)
+            ELSE cardinality(reviewers) - 1 - u.position % cardinality(reviewers)
+        END
+    )
+    UPDATE images i
+    SET assigned_to = p.user_id, assigned_at = NOW()
+    FROM plan p
+    WHERE i.source_url = p.source_url AND i.assigned_to IS NULL;
+
+    -- NOW() is the transaction start, so it marks the rows assigned by this run
+    RETURN QUERY
+    SELECT
+        u.id,
+        u.username,
+        COUNT(DISTINCT i.source_url),
+        COUNT(i.id) FILTER (WHERE i.assigned_at = NOW()),
+        COUNT(i.id) FILTER (WHERE i.prompt IS NULL OR i.prompt = '')
+    FROM users u
+    LEFT JOIN images i ON i.assigned_to = u.id
+    WHERE u.id = ANY(reviewers)
+    GROUP BY u.id, u.username
+    ORDER BY u.username;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION assign_images(UUID[]) IS 'Balanced, source-preserving assignment of unassigned images to reviewers';
+
+-- 14. Scheduled refresh of the reporting views (section 8)
+-- pg_cron runs refresh_reporting_views() every minute. A run is skipped when no images
+-- or users row has changed since the previous refresh (checked on the updated_at
+-- indexes), so an idle table costs nothing. Deletes do not move updated_at, so a
+-- nightly run refreshes unconditionally.
+CREATE TABLE IF NOT EXISTS reporting_refresh (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    refreshed_at TIMESTAMP WITH TIME ZONE,
+    images_watermark TIMESTAMP WITH TIME ZONE,
+    users_watermark TIMESTAMP WITH TIME ZONE
+);
+
+-- Readable by everyone (the dashboard shows refreshed_at); only refresh_reporting_views() writes it
+ALTER TABLE reporting_refresh ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view the refresh state" ON reporting_refresh FOR SELECT USING (true);
+
+-- Runs as its owner, who owns the views and bypasses RLS; not callable through the API
+CREATE OR REPLACE FUNCTION refresh_reporting_views(force BOOLEAN DEFAULT false)
+RETURNS BOOLEAN AS $$
+DECLARE
+    images_mark TIMESTAMP WITH TIME ZONE := (SELECT MAX(updated_at) FROM images);
+    users_mark TIMESTAMP WITH TIME ZONE := (SELECT MAX(updated_at) FROM users);
+    previous reporting_refresh%ROWTYPE;
+BEGIN
+    -- Skip instead of queueing behind a refresh that is still running
+    IF NOT pg_try_advisory_xact_lock(hashtext('refresh_reporting_views')) THEN
+        RETURN false;
+    END IF;
+
+    SELECT * INTO previous FROM reporting_refresh;
+    IF NOT force
+       AND previous.images_watermark IS NOT DISTINCT FROM images_mark
+       AND previous.users_watermark IS NOT DISTINCT FROM users_mark THEN
+        RETURN false;
+    END IF;
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY progress_overview;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY user_progress;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY source_progress;
+
+    INSERT INTO reporting_refresh (id, refreshed_at, images_watermark, users_watermark)
+    VALUES (true, NOW(), images_mark, users_mark)
+    ON CONFLICT (id) DO UPDATE
+    SET refreshed_at = EXCLUDED.refreshed_at,
+        images_watermark = EXCLUDED.images_watermark,
+        users_watermark = EXCLUDED.users_watermark;
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION refresh_reporting_views(BOOLEAN) FROM PUBLIC, anon, authenticated;
+
+COMMENT ON FUNCTION refresh_reporting_views(BOOLEAN) IS 'Refresh the reporting materialized views if images or users changed';
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+-- cron.schedule() replaces an existing job with the same name
+SELECT cron.schedule('refresh-reporting-views', '* * * * *', 'SELECT refresh_reporting_views()');
+SELECT cron.schedule('refresh-reporting-views-nightly', '30 3 * * *', 'SELECT refresh_reporting_views(true)');
+
+-- 15. Change feed for cross-session cache coherence
+-- Every insert, update and delete on images is logged here by statement-level triggers
+-- (one INSERT ... SELECT per statement, however many rows it touched). Each app process
+-- polls the log for sequence numbers past the last one it saw and refreshes only the
+-- rows and caches affected. Updates record which columns changed and are skipped when
+-- none did. Entries older than a day are pruned.
+CREATE TABLE IF NOT EXISTS images_changes (
+    seq BIGSERIAL PRIMARY KEY,
+    image_id BIGINT NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    fields TEXT[],
+    changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_images_changes_changed_at ON images_changes(changed_at);
+
+-- Every app process polls the log; only the triggers below write it. They run as their
+-- owner (SECURITY DEFINER), so a reviewer's save is logged without any write policy here.
+ALTER TABLE images_changes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view the change log" ON images_changes FOR SELECT USING (true);
+
+CREATE OR REPLACE FUNCTION log_images_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO images_changes (image_id, op)
+    SELECT id, 'I' FROM new_rows;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION log_images_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO images_changes (image_id, op, fields)
+    SELECT id, 'U', fields
+    FROM (
+        SELECT n.id, ARRAY_REMOVE(ARRAY[
+            CASE WHEN n.source_url IS DISTINCT FROM o.source_url THEN 'source_url' END,
+            CASE WHEN n.image_url IS DISTINCT FROM o.image_url THEN 'image_url' END,
+            CASE WHEN n.cdn_url IS DISTINCT FROM o.cdn_url THEN 'cdn_url' END,
+            CASE WHEN n.image_title IS DISTINCT FROM o.image_title THEN 'image_title' END,
+            CASE WHEN n.image_alt IS DISTINCT FROM o.image_alt THEN 'image_alt' END,
+            CASE WHEN n.image_status IS DISTINCT FROM o.image_status THEN 'image_status' END,
+            CASE WHEN n.prompt IS DISTINCT FROM o.prompt THEN 'prompt' END,
+            CASE WHEN n.notes IS DISTINCT FROM o.notes THEN 'notes' END,
+            CASE WHEN n.ref_image_url IS DISTINCT FROM o.ref_image_url THEN 'ref_image_url' END,
+            CASE WHEN n.assigned_to IS DISTINCT FROM o.assigned_to THEN 'assigned_to' END
+        ], NULL) AS fields
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+    ) changed
+    WHERE cardinality(fields) > 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION log_images_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO images_changes (image_id, op)
+    SELECT id, 'D' FROM old_rows;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS log_images_insert ON images;
+CREATE TRIGGER log_images_insert
+    AFTER INSERT ON images
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_images_insert();
+
+DROP TRIGGER IF EXISTS log_images_update ON images;
+CREATE TRIGGER log_images_update
+    AFTER UPDATE ON images
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_images_update();
+
+DROP TRIGGER IF EXISTS log_images_delete ON images;
+CREATE TRIGGER log_images_delete
+    AFTER DELETE ON images
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_images_delete();
+
+COMMENT ON TABLE images_changes IS 'Change log of images polled by the app to keep its caches current';
+
+SELECT cron.schedule('prune-images-changes', '0 * * * *', $$DELETE FROM images_changes WHERE changed_at < NOW() - INTERVAL '1 day'$$);
+
+-- 16. Export of completed images for the image-editing job (export_prompts.py)
+-- The export reads completed rows in id order, one keyset page at a time; this partial
+-- index holds only completed images, so each page is a short range scan.
+CREATE INDEX IF NOT EXISTS idx_images_completed ON images(id) WHERE prompt IS NOT NULL AND prompt != '';
+
+-- 17. Bulk partial updates of images (save_records() in streamlit_app.py)
+-- changes is a JSON array of objects holding an id and the columns to set; a column missing
+-- from an object keeps its value. This is a plain UPDATE, so the UPDATE policies of section 7
+-- apply as they do to single-row saves, and ids that do not exist (or are not visible) are
+-- left out of the result instead of being inserted. Returns the ids that were updated.
+CREATE OR REPLACE FUNCTION update_images(changes JSONB)
+RETURNS SETOF BIGINT AS $$
+    UPDATE images i
+    SET
+        image_title = CASE WHEN c.value ? 'image_title' THEN c.value->>'image_title' ELSE i.image_title END,
+        image_alt = CASE WHEN c.value ? 'image_alt' THEN c.value->>'image_alt' ELSE i.image_alt END,
+        image_status = CASE WHEN c.value ? 'image_status' THEN (c.value->>'image_status')::BOOLEAN ELSE i.image_status END,
+        prompt = CASE WHEN c.value ? 'prompt' THEN c.value->>'prompt' ELSE i.prompt END,
+        notes = CASE WHEN c.value ? 'notes' THEN c.value->>'notes' ELSE i.notes END,
+        ref_image_url = CASE WHEN c.value ? 'ref_image_url' THEN c.value->>'ref_image_url' ELSE i.ref_image_url END
+    FROM jsonb_array_elements(changes) AS c
+    WHERE i.id = (c.value->>'id')::BIGINT
+    RETURNING i.id::BIGINT;
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION update_images(JSONB) IS 'Partial update of many images by id in one statement';
+
+-- 18. Prompt check for Batch Prompts (the "only images without a prompt" option)
+-- The selection's ids travel in the request body, so a large selection is one call
+-- instead of one URL-length chunk of ids per request. Returns the ids without a prompt.
+CREATE OR REPLACE FUNCTION images_without_prompt(ids BIGINT[])
+RETURNS SETOF BIGINT AS $$
+    SELECT id::BIGINT FROM images WHERE id = ANY(ids) AND (prompt IS NULL OR prompt = '');
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION images_without_prompt(BIGINT[]) IS 'Ids among the given ones whose image has no prompt yet';
@@ -0,0 +1,56 @@
+import pytest
+
+from data_access import LocalMirrorRepository
+from fake_supabase import synthetic_images
+
+pytest.importorskip("duckdb")
+
+
+def row_keys(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    images = synthetic_images(230)
+    # A few rows without a source: they sort after every other row
+    images.loc[images["id"].isin([3, 100, 229]), "source_url"] = None
+    repository = LocalMirrorRepository(str(tmp_path / "mirror.duckdb"))
+    repository.load_rows(images.to_dict("records"))
+    ordered = images.sort_values(["source_url", "id"], na_position="last")
+    repository.expected = ordered["id"].tolist()
+    return repository
+
+
+def test_paging_forward_then_back_visits_every_row_in_order(mirror):
+    pages = [mirror.browse_page("id, source_url", 50)]
+    while len(pages[-1]) == 50:
+        last = pages[-1][-1]
+        pages.append(mirror.browse_page("id, source_url", 50, after=(last["source_url"], last["id"])))
+    assert [record_id for page in pages for record_id in row_keys(page)] == mirror.expected
+
+    # Going back from each page's first row returns the page before it
+    for previous, page in zip(pages, pages[1:]):
+        first = page[0]
+        assert mirror.browse_page("id, source_url", 50, before=(first["source_url"], first["id"])) == previous
+
+
+def test_last_page_ends_with_the_rows_without_a_source(mirror):
+    last = mirror.browse_page("id, source_url", 20, from_end=True)
+
+    assert row_keys(last) == mirror.expected[-20:]
+    assert row_keys(last)[-3:] == [3, 100, 229]
+    assert all(row["source_url"] is None for row in last[-3:])
+
+    # Cursors on a row without a source, as a page boundary inside that tail leaves them
+    assert row_keys(mirror.browse_page("id, source_url", 20, after=(None, 3))) == [100, 229]
+    assert row_keys(mirror.browse_page("id, source_url", 20, before=(None, 100))) == mirror.expected[-22:-2]
+
+
+def test_status_filter_is_kept_across_pages(mirror):
+    first = mirror.browse_page("id, source_url, image_status", 40, status=True)
+    last = first[-1]
+    second = mirror.browse_page("id, source_url, image_status", 40, status=True, after=(last["source_url"], last["id"]))
+
+    assert all(row["image_status"] is True for row in first + second)
+    assert not set(row_keys(first)) & set(row_keys(second))
@@ -0,0 +1,55 @@
+import pytest
+
+from data_access import LocalMirrorRepository, SupabaseRepository, summarize_sources
+from fake_supabase import FakeSupabaseClient, synthetic_images
+
+
+def expected_progress(images):
+    """Per-source counters computed straight from the frame"""
+    prompt = images["prompt"]
+    counts = images.assign(
+        completed=prompt.notna() & (prompt != ""),
+        valid=images["image_status"].eq(True),
+        invalid=images["image_status"].eq(False),
+    ).groupby("source_url")
+    return {
+        source_url: (len(group), int(group["completed"].sum()), int(group["valid"].sum()), int(group["invalid"].sum()))
+        for source_url, group in counts
+    }
+
+
+def progress_by_source(rows):
+    return {
+        row["source_url"]: (row["total_images"], row["completed_images"], row["valid_images"], row["invalid_images"])
+        for row in rows
+    }
+
+
+def test_progress_summary_matches_the_images_on_both_backends(tmp_path):
+    pytest.importorskip("duckdb")
+    images = synthetic_images(2000)
+    mirror = LocalMirrorRepository(str(tmp_path / "mirror.duckdb"))
+    mirror.load_rows(images.to_dict("records"))
+    expected = expected_progress(images)
+
+    for repository in (SupabaseRepository(FakeSupabaseClient(images.copy())), mirror):
+        rows = repository.progress_summary()
+        assert progress_by_source(rows) == expected
+        totals = [row["total_images"] for row in rows]
+        assert totals == sorted(totals, reverse=True)
+        overview = summarize_sources(rows)
+        assert overview["total_images"] == len(images)
+        assert overview["completed_images"] == images["prompt"].notna().sum()
+        assert overview["total_sources"] == len(expected)
+
+
+def test_without_prompt_checks_a_large_selection_in_one_request():
+    images = synthetic_images(3000)
+    client = FakeSupabaseClient(images)
+    ids = images["id"].tolist()
+
+    before = client.requests
+    missing = SupabaseRepository(client).without_prompt(ids)
+
+    assert client.requests - before == 1
+    assert missing == set(images.loc[images["prompt"].isna(), "id"])
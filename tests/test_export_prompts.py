@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+import pytest
+
+from data_access import LocalMirrorRepository
+from export_prompts import export_completed
+from fake_supabase import synthetic_images
+
+pytest.importorskip("duckdb")
+
+
+def exported_prompts(path):
+    """Prompt per id as a consumer reads the export: a later line for an id supersedes earlier ones"""
+    with open(path, encoding="utf-8") as f:
+        return {row["id"]: row["prompt"] for row in map(json.loads, f)}
+
+
+def test_resume_exports_rows_completed_or_re_edited_below_the_last_id(tmp_path):
+    images = synthetic_images(300)
+    # An hour apart, and the newest not completed, so no exported row is inside the watermark overlap
+    images["updated_at"] = (pd.Timestamp("2025-01-01", tz="UTC") + pd.to_timedelta(images["id"], unit="h")).map(pd.Timestamp.isoformat)
+    images.loc[images.index[-1], "prompt"] = None
+    repository = LocalMirrorRepository(str(tmp_path / "mirror.duckdb"))
+    repository.load_rows(images.to_dict("records"))
+    path = str(tmp_path / "prompts.jsonl")
+
+    first = export_completed(repository, path, page_size=50)
+    completed = images.loc[images["prompt"].notna(), "id"]
+    assert first["rows"] == len(completed)
+    assert first["last_id"] == completed.max()
+
+    # Between runs: an image below the last exported id is completed, and an exported one re-edited
+    newly_completed = int(images.loc[images["prompt"].isna(), "id"].min())
+    re_edited = int(completed.min())
+    repository.update(newly_completed, {"prompt": "completed later"})
+    repository.update(re_edited, {"prompt": "edited again"})
+
+    resumed = export_completed(repository, path, resume=True, page_size=50)
+    assert resumed["rows"] == first["rows"] + 2
+    prompts = exported_prompts(path)
+    assert prompts[newly_completed] == "completed later"
+    assert prompts[re_edited] == "edited again"
+
+    # The two are inside the watermark overlap, so a further resume reads them again but writes nothing
+    again = export_completed(repository, path, resume=True, page_size=50)
+    assert again["rows"] == resumed["rows"]
+    assert exported_prompts(path) == prompts
+    assert export_completed(repository, path, resume=True, page_size=50)["rows"] == resumed["rows"]
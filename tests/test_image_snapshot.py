@@ -0,0 +1,55 @@
+import threading
+
+from streamlit_app import ImageSnapshot
+
+
+def image_row(record_id, title="original"):
+    return {
+        "id": record_id,
+        "source_url": f"https://www.vietnamairlines.com/post-{record_id % 7}",
+        "image_url": f"https://www.vietnamairlines.com/images/{record_id}.jpg",
+        "image_title": title,
+        "image_alt": "",
+        "image_status": None,
+        "updated_at": f"2026-01-01T00:00:{record_id % 60:02d}+00:00",
+    }
+
+
+def run_together(*targets):
+    start = threading.Barrier(len(targets))
+
+    def run(target):
+        start.wait()
+        target()
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_patches_and_merges_from_several_threads_are_all_kept():
+    snapshot = ImageSnapshot()
+    snapshot.replace([image_row(record_id) for record_id in range(1, 201)])
+
+    def merge_new_rows():
+        # A sync merging rows inserted elsewhere
+        for record_id in range(201, 401):
+            snapshot.merge([image_row(record_id)])
+
+    def patch_saved_edits():
+        # The write-behind queue or change feed writing saved edits through
+        for record_id in range(1, 201):
+            snapshot.patch({record_id: {"image_title": f"edited {record_id}"}})
+
+    def remove_deleted_rows():
+        for record_id in range(401, 450):
+            snapshot.remove([record_id])
+
+    run_together(merge_new_rows, patch_saved_edits, remove_deleted_rows)
+
+    titles = snapshot.frame.set_index("id")["image_title"]
+    assert sorted(titles.index) == list(range(1, 401))
+    assert all(titles[record_id] == f"edited {record_id}" for record_id in range(1, 201))
+    assert all(titles[record_id] == "original" for record_id in range(201, 401))
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from data_access import POST_COLUMNS, SupabaseRepository
+from fake_supabase import FakeSupabaseClient, synthetic_images
+from import_traffic import import_files
+
+
+def test_posts_are_stored_under_the_images_source_url(tmp_path):
+    images = synthetic_images(50)
+    stored_url = "HTTPS://www.VietnamAirlines.com/vn/vi/useful-information/travel-guide/ha-noi-guide-0/"
+    images.loc[images["source_url"].str.endswith("ha-noi-guide-0"), "source_url"] = stored_url
+    client = FakeSupabaseClient(images)
+    client.tables["posts"] = pd.DataFrame(columns=POST_COLUMNS)
+
+    spreadsheet = tmp_path / "traffic.csv"
+    spreadsheet.write_text(
+        "Bài đăng,Tỉnh thành\n"
+        "vietnamairlines.com/vn/vi/useful-information/travel-guide/ha-noi-guide-0,Hà Nội\n"
+        "https://www.vietnamairlines.com/vn/vi/not-scraped/,Huế\n",
+        encoding="utf-8"
+    )
+    summary = import_files(SupabaseRepository(client), [str(spreadsheet)])
+
+    assert summary["imported"] == 2
+    assert summary["unmatched_preview"] == ["https://www.vietnamairlines.com/vn/vi/not-scraped"]
+    posts = client.tables["posts"].set_index("province")["source_url"]
+    # Matched on the normalized form, stored as images.source_url has it so the tables join as is
+    assert posts["Hà Nội"] == stored_url
+    assert posts["Huế"] == "https://www.vietnamairlines.com/vn/vi/not-scraped"
+
+
+def test_post_matched_after_its_images_are_scraped_moves_to_their_source_url(tmp_path):
+    images = synthetic_images(20)
+    client = FakeSupabaseClient(images)
+    client.tables["posts"] = pd.DataFrame(columns=POST_COLUMNS)
+    spreadsheet = tmp_path / "traffic.csv"
+    spreadsheet.write_text("Bài đăng,Tỉnh thành\nwww.vietnamairlines.com/vn/vi/new-post/,Huế\n", encoding="utf-8")
+
+    import_files(SupabaseRepository(client), [str(spreadsheet)])
+    assert client.tables["posts"]["source_url"].tolist() == ["https://www.vietnamairlines.com/vn/vi/new-post"]
+
+    # The scraper stores the post's images under its own spelling of the URL
+    scraped_url = "https://www.vietnamairlines.com/vn/vi/new-post/"
+    client.tables["images"].loc[0, "source_url"] = scraped_url
+    summary = import_files(SupabaseRepository(client), [str(spreadsheet)])
+
+    assert summary["unmatched"] == 0
+    assert client.tables["posts"]["source_url"].tolist() == [scraped_url]
@@ -0,0 +1,61 @@
+import json
+
+import pandas as pd
+import pytest
+
+from prompt_templates import load_example_spec, parse_template, render_prompts, template_fields
+
+TEMPLATE = json.dumps({
+    "change": {"style": "Redraw {image_title} in the brand style", "note": "{{keep}} braces"},
+    "keep": {"subject": "{image_alt}", "ratio": "same as {image_title}"},
+})
+
+
+def test_each_row_renders_as_the_spec_with_its_values_substituted():
+    frame = pd.DataFrame({
+        "image_title": ['Phố cổ "Hội An"', "Hồ Gươm\nvề đêm", None],
+        "image_alt": ["đèn lồng \\ đêm", "mặt hồ", "Nội Bài"],
+    })
+    template = parse_template(TEMPLATE)
+
+    prompts = render_prompts(template, frame)
+
+    assert template_fields(template) == ["image_title", "image_alt"]
+    for prompt, (_, row) in zip(prompts, frame.iterrows()):
+        title = "" if pd.isna(row["image_title"]) else row["image_title"]
+        # Valid JSON laid out like prompt.json, values escaped, {{ }} left as literal braces
+        assert json.loads(prompt) == {
+            "change": {"style": f"Redraw {title} in the brand style", "note": "{keep} braces"},
+            "keep": {"subject": row["image_alt"], "ratio": f"same as {title}"},
+        }
+        assert prompt.startswith('{\n    "change"')
+
+
+def test_template_without_placeholders_gives_every_row_the_same_prompt():
+    template = parse_template(load_example_spec())
+    prompts = render_prompts(template, pd.DataFrame({"image_title": ["a", "b"]}))
+
+    assert prompts.nunique() == 1
+    assert json.loads(prompts.iloc[0]) == template
+
+
+def test_unknown_field_is_reported():
+    template = parse_template('{"change": {"style": "Redraw {image_caption}"}}')
+
+    with pytest.raises(ValueError, match="image_caption"):
+        render_prompts(template, pd.DataFrame({"image_title": ["a"]}))
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[]",
+    '{"remove": {"a": "b"}}',
+    '{"change": "text"}',
+    '{"change": {"style": 3}}',
+    '{"change": {"style": "unclosed {image_title"}}',
+    '{"change": {"style": "{image_title!r}"}}',
+    '{"change": {"style": "{image_title.upper}"}}',
+])
+def test_malformed_templates_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_template(text)
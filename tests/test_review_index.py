@@ -0,0 +1,58 @@
+import pandas as pd
+
+from streamlit_app import ImageSnapshot, ReviewIndex
+
+
+def interleaved_frame():
+    # Sources interleaved as rows arrive from the table, plus one row without a source
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5, 6, 7],
+        "source_url": ["a", "b", "a", None, "c", "b", "a"],
+    })
+
+
+def test_rows_are_grouped_by_source_in_first_appearance_order():
+    index = ReviewIndex(interleaved_frame())
+
+    assert index.sources == ["a", "b", "c"]
+    assert index.counts.tolist() == [3, 2, 1]
+    assert index.offsets.tolist() == [0, 3, 5]
+    assert index.total == 6
+    assert index.frame["id"].tolist() == [1, 3, 7, 2, 6, 5]
+    assert index.image(1, 1)["id"] == 6
+
+
+def test_walking_next_and_previous_visits_every_image_once():
+    index = ReviewIndex(interleaved_frame())
+
+    forward = [(0, 0)]
+    while (step := index.next(*forward[-1])) is not None:
+        forward.append(step)
+    assert forward == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)]
+    assert [index.position(*step) for step in forward] == list(range(index.total))
+
+    backward = [forward[-1]]
+    while (step := index.previous(*backward[-1])) is not None:
+        backward.append(step)
+    assert backward == forward[::-1]
+
+
+def test_upcoming_crosses_source_boundaries_and_stops_at_the_end():
+    index = ReviewIndex(interleaved_frame())
+
+    assert index.upcoming(0, 1, 3)["id"].tolist() == [7, 2, 6]
+    assert index.upcoming(1, 1, 5)["id"].tolist() == [5]
+    assert index.upcoming(2, 0, 5).empty
+
+
+def test_snapshot_rebuilds_its_index_only_when_the_frame_changes():
+    snapshot = ImageSnapshot()
+    snapshot.replace(interleaved_frame().to_dict("records"))
+
+    index = snapshot.review_index()
+    assert snapshot.review_index() is index
+
+    snapshot.merge([{"id": 8, "source_url": "c"}])
+    rebuilt = snapshot.review_index()
+    assert rebuilt is not index
+    assert rebuilt.counts.tolist() == [3, 2, 2]
@@ -0,0 +1,62 @@
+from review_journal import ReviewJournal, WriteBehindQueue
+
+
+def make_queue(tmp_path, rejected=(), **options):
+    def save(changes_by_id):
+        return {
+            record_id: (False, "new row violates row-level security policy") if record_id in rejected else (True, None)
+            for record_id in changes_by_id
+        }
+
+    # The worker never fires on its own; the tests flush explicitly
+    return WriteBehindQueue(ReviewJournal(str(tmp_path / "journal.sqlite3")), save, interval=3600, **options)
+
+
+def test_record_that_keeps_failing_moves_to_the_failed_list(tmp_path):
+    queue = make_queue(tmp_path, rejected={2}, max_attempts=3)
+    queue.enqueue(1, {"prompt": "saved"})
+    queue.enqueue(2, {"prompt": "rejected"})
+
+    for _ in range(2):
+        queue.flush()
+        assert queue.pending_count() == 1
+        assert queue.errors([2]) == {2: "new row violates row-level security policy"}
+
+    queue.flush()
+    assert queue.pending_count() == 0
+    assert queue.failed_records() == {2: {"changes": {"prompt": "rejected"}, "error": "new row violates row-level security policy"}}
+    # No longer retried
+    assert queue.flush() == {}
+    queue.stop()
+
+    # The failed list survives a restart and its edits can be queued again
+    restarted = make_queue(tmp_path)
+    assert restarted.pending_count() == 0
+    assert list(restarted.failed_records()) == [2]
+    restarted.retry_failed([2])
+    assert restarted.pending(2) == {"prompt": "rejected"}
+    assert restarted.flush() == {2: (True, None)}
+    assert restarted.failed_records() == {}
+    restarted.stop()
+
+
+def test_worker_flush_skips_records_backing_off(tmp_path):
+    queue = make_queue(tmp_path, rejected={1})
+    queue.enqueue(1, {"notes": "x"})
+    queue.flush()
+
+    assert queue.flush(due_only=True) == {}
+    assert queue.flush([1]) == {1: (False, "new row violates row-level security policy")}
+    queue.stop()
+
+
+def test_counts_and_flushes_can_be_scoped_to_one_session(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(1, {"prompt": "mine"})
+    queue.enqueue(2, {"prompt": "someone else's"})
+
+    assert queue.pending_count({1}) == 1
+    assert queue.flush({1}) == {1: (True, None)}
+    assert queue.pending_count() == 1
+    assert queue.pending(2) == {"prompt": "someone else's"}
+    queue.stop()
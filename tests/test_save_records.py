@@ -0,0 +1,37 @@
+import math
+
+from data_access import SupabaseRepository
+from fake_supabase import FakeSupabaseClient, synthetic_images
+from streamlit_app import save_records
+
+
+def test_each_chunk_is_saved_in_one_request_and_only_edited_fields_change():
+    images = synthetic_images(1000)
+    client = FakeSupabaseClient(images.copy())
+    original = images.set_index("id")
+    changes = {record_id: {"prompt": f"prompt {record_id}"} for record_id in range(1, 451)}
+    changes.update({record_id: {"image_status": True, "notes": "checked"} for record_id in range(451, 901)})
+
+    before = client.requests
+    results = save_records(SupabaseRepository(client), changes, chunk_size=200)
+
+    assert client.requests - before == math.ceil(len(changes) / 200)
+    assert results == {record_id: (True, None) for record_id in changes}
+    saved = client.tables["images"].set_index("id")
+    assert saved.loc[10, "prompt"] == "prompt 10"
+    assert saved.loc[10, "image_status"] == original.loc[10, "image_status"]
+    assert saved.loc[500, ["image_status", "notes"]].tolist() == [True, "checked"]
+    assert saved.loc[500, "prompt"] == original.loc[500, "prompt"]
+    # Rows outside the selection are untouched
+    assert saved.loc[950:].drop(columns="updated_at").equals(original.loc[950:].drop(columns="updated_at"))
+
+
+def test_missing_ids_are_reported_as_failures_and_not_inserted():
+    client = FakeSupabaseClient(synthetic_images(100))
+
+    results = save_records(SupabaseRepository(client), {5: {"prompt": "kept"}, 5000: {"prompt": "lost"}})
+
+    assert results[5] == (True, None)
+    assert results[5000][0] is False
+    assert len(client.tables["images"]) == 100
+    assert 5000 not in set(client.tables["images"]["id"])
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from data_access import LocalMirrorRepository
+from search_index import fold_text
+
+
+def test_fold_text_strips_vietnamese_diacritics_and_punctuation():
+    assert fold_text("Hà Nội") == "ha noi"
+    assert fold_text("Đà Nẵng – Phố cổ Hội An!") == "da nang pho co hoi an"
+    assert fold_text("ĐƯỜNG") == "duong"
+    assert fold_text(None) == ""
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    pytest.importorskip("duckdb")
+    titles = [
+        (1, "Phố cổ Hội An về đêm", ""),
+        (2, "Hồ Hoàn Kiếm", "Hà Nội mùa thu, Hà Nội"),
+        (3, "Sân bay Nội Bài", "Hà Nội"),
+        (4, "Ha Noi 100% local", "street_food"),
+        (5, "Bãi biển Đà Nẵng", None),
+        (6, "Hanoian coffee", ""),
+    ]
+    frame = pd.DataFrame(titles, columns=["id", "image_title", "image_alt"]).assign(
+        source_url="https://www.vietnamairlines.com/post", image_status=[True, True, False, None, True, True]
+    )
+    repository = LocalMirrorRepository(str(tmp_path / "mirror.duckdb"))
+    repository.load_rows(frame.to_dict("records"))
+    return repository
+
+
+def search_ids(mirror, term, status=None):
+    return [row["id"] for row in mirror.search_page("id", term, status=status)]
+
+
+def test_search_ignores_accents_and_ranks_whole_word_hits_first(mirror):
+    # Row 2 says Hà Nội twice; 'Hanoian' in row 6 is a different word
+    assert search_ids(mirror, "ha noi") == [2, 3, 4]
+    assert search_ids(mirror, "Hà Nội") == [2, 3, 4]
+    assert mirror.count_search("ha noi") == 3
+    assert search_ids(mirror, "da nang") == [5]
+    assert search_ids(mirror, "hoi an") == [1]
+
+
+def test_search_matches_substrings_and_filters_on_status(mirror):
+    assert search_ids(mirror, "hanoi") == [6]
+    assert search_ids(mirror, "ha noi", status=True) == [2]
+    assert search_ids(mirror, "ha noi", status=False) == [3]
+    assert mirror.count_search("ha noi", status=False) == 1
+
+
+def test_like_wildcards_in_the_term_match_literally(mirror):
+    assert search_ids(mirror, "100%") == [4]
+    assert search_ids(mirror, "street_food") == [4]
+    assert search_ids(mirror, "%") == [4]
+    assert search_ids(mirror, "_") == [4]
@@ -0,0 +1,105 @@
+import io
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from thumbnails import PREVIEW_SIZE, THUMBNAIL_SIZE, ThumbnailCache
+
+
+def png_bytes():
+    output = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (200, 30, 60)).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def image_server():
+    """Local HTTP server: /missing/* answers 404, any other path the same PNG; counts requests per path"""
+    body = png_bytes()
+    requests = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests[self.path] += 1
+            if self.path.startswith("/missing/"):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = lambda path: f"http://127.0.0.1:{server.server_port}{path}"
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_cached_thumbnail_is_served_without_downloading_again(tmp_path, image_server):
+    url = image_server.url("/a.png")
+    cache = ThumbnailCache(str(tmp_path))
+
+    thumbnail = cache.get(url, THUMBNAIL_SIZE)
+    assert max(Image.open(io.BytesIO(thumbnail)).size) == THUMBNAIL_SIZE
+    assert cache.get(url, THUMBNAIL_SIZE) == thumbnail
+    # The preview it was derived from is cached too, and so is everything after a restart
+    cache.get(url, PREVIEW_SIZE)
+    assert ThumbnailCache(str(tmp_path)).get(url, THUMBNAIL_SIZE) == thumbnail
+    assert image_server.requests["/a.png"] == 1
+
+
+def test_least_recently_used_image_is_evicted(tmp_path, image_server):
+    cache = ThumbnailCache(str(tmp_path))
+    cache.get(image_server.url("/a.png"), PREVIEW_SIZE)
+    cache.max_bytes = cache.total_bytes * 2  # room for two images
+
+    cache.get(image_server.url("/b.png"), PREVIEW_SIZE)
+    cache.get(image_server.url("/a.png"), PREVIEW_SIZE)  # a is now more recent than b
+    cache.get(image_server.url("/c.png"), PREVIEW_SIZE)
+    assert cache.total_bytes <= cache.max_bytes
+
+    cache.get(image_server.url("/a.png"), PREVIEW_SIZE)
+    cache.get(image_server.url("/b.png"), PREVIEW_SIZE)
+    assert image_server.requests["/a.png"] == 1
+    assert image_server.requests["/b.png"] == 2
+
+
+def test_failing_url_is_not_retried_until_its_ttl_expires(tmp_path, image_server):
+    url = image_server.url("/missing/a.png")
+    cache = ThumbnailCache(str(tmp_path), failure_ttl=1)
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            cache.get(url, THUMBNAIL_SIZE)
+    assert cache.data_uris([url]) == [url]
+    assert image_server.requests["/missing/a.png"] == 1
+
+    time.sleep(1.1)
+    with pytest.raises(Exception):
+        cache.get(url, THUMBNAIL_SIZE)
+    assert image_server.requests["/missing/a.png"] == 2
+
+
+def test_data_uris_do_not_wait_for_downloads(tmp_path, image_server):
+    url = image_server.url("/a.png")
+    cache = ThumbnailCache(str(tmp_path))
+
+    # Cold: the original URL now, the thumbnail fetched in the background for a later rerun
+    assert cache.data_uris([url, None]) == [url, None]
+    deadline = time.time() + 10
+    while cache.data_uris([url])[0] == url and time.time() < deadline:
+        time.sleep(0.05)
+    assert cache.data_uris([url])[0].startswith("data:image/jpeg;base64,")
+    assert image_server.requests["/a.png"] == 1
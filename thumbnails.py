@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+# Cache location and size bound (bytes on disk)
+THUMBNAIL_CACHE_DIR = os.environ.get("VNA_THUMBNAIL_DIR", ".thumbnail_cache")
+THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get("VNA_THUMBNAIL_CACHE_MB", "500")) * 1024 * 1024
+
+# Longest edge in pixels: grid thumbnails and the large review/post previews
+THUMBNAIL_SIZE = 320
+PREVIEW_SIZE = 1280
+
+FETCH_TIMEOUT = 15
+FETCH_WORKERS = 8
+JPEG_QUALITY = 85
+# Seconds a URL that could not be downloaded or decoded is not tried again
+FAILURE_TTL = int(os.environ.get("VNA_THUMBNAIL_FAILURE_TTL", "300"))
+# Remembered failures beyond which expired ones are dropped
+FAILURE_CACHE_SIZE = 10_000
+
+# Review prefetch: how many upcoming images to warm, and the in-memory budget for them
+PREFETCH_DEPTH = int(os.environ.get("VNA_PREFETCH_DEPTH", "5"))
+PREFETCH_MEMORY_BYTES = int(os.environ.get("VNA_PREFETCH_MEMORY_MB", "64")) * 1024 * 1024
+PREFETCH_WORKERS = 2
+
+
+class ThumbnailCache:
+    """Downsized copies of remote images kept in a size-bounded on-disk LRU cache
+
+    Each source URL is downloaded once and stored at PREVIEW_SIZE; smaller sizes are
+    derived from that copy. Recency is tracked by file mtime so it survives restarts.
+    A URL that fails is not tried again for failure_ttl seconds.
+    """
+
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES, timeout=FETCH_TIMEOUT,
+                 failure_ttl=FAILURE_TTL, fill_workers=FETCH_WORKERS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.failure_ttl = failure_ttl
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=fill_workers, thread_name_prefix="thumbnail-fill")
+        self._failures = {}   # url -> (retry_at, error)
+        self._filling = set()  # (url, size) being fetched in the background
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Rebuild the LRU order (oldest first) from what is already on disk
+        self._entries = OrderedDict()
+        files = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith(".jpg") and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+        self.total_bytes = sum(self._entries.values())
+        self._evict()
+
+    def get(self, url, size=THUMBNAIL_SIZE):
+        """JPEG bytes of url scaled to fit within size x size pixels"""
+        key = self._key(url, size)
+        data = self._read(key)
+        if data is not None:
+            return data
+
+        if size >= PREVIEW_SIZE:
+            data = self._fetch(url, size)
+        else:
+            data = self._resize(self.get(url, PREVIEW_SIZE), size)
+        self._store(key, data)
+        return data
+
+    def data_uri(self, url, size=THUMBNAIL_SIZE):
+        """Thumbnail as a data: URI, usable wherever an image URL is expected"""
+        return "data:image/jpeg;base64," + base64.b64encode(self.get(url, size)).decode("ascii")
+
+    def data_uris(self, urls, size=THUMBNAIL_SIZE):
+        """Data URIs for the URLs whose thumbnail is already cached, without waiting on any download
+
+        The others keep their original value and are cached in the background, so a later
+        rerun shows them as thumbnails. Empty entries are left as they are.
+        """
+        values = []
+        for url in urls:
+            if isinstance(url, str) and url:
+                data = self._read(self._key(url, size))
+                if data is not None:
+                    url = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+                else:
+                    self.fill(url, size)
+            values.append(url)
+        return values
+
+    def fill(self, url, size=THUMBNAIL_SIZE):
+        """Cache url's thumbnail on a background worker, unless it is already being fetched or failed recently"""
+        with self.lock:
+            if (url, size) in self._filling or self._failed(url) is not None:
+                return
+            self._filling.add((url, size))
+        self.executor.submit(self._fill, url, size)
+
+    def _fill(self, url, size):
+        try:
+            self.get(url, size)
+        except Exception:
+            pass  # remembered by _fetch(), so it is not retried before failure_ttl
+        finally:
+            with self.lock:
+                self._filling.discard((url, size))
+
+    def _fetch(self, url, size):
+        """Download url and resize it, remembering a failure for failure_ttl seconds"""
+        with self.lock:
+            error = self._failed(url)
+        if error is not None:
+            raise OSError(f"{url} failed less than {self.failure_ttl}s ago: {error}")
+        try:
+            data = self._resize(self._download(url), size)
+        except Exception as e:
+            now = time.time()
+            with self.lock:
+                if len(self._failures) >= FAILURE_CACHE_SIZE:
+                    self._failures = {key: value for key, value in self._failures.items() if value[0] > now}
+                self._failures[url] = (now + self.failure_ttl, str(e))
+            raise
+        with self.lock:
+            self._failures.pop(url, None)
+        return data
+
+    def _failed(self, url):
+        """Error of url's last attempt if it failed within failure_ttl, else None (caller holds the lock)"""
+        failure = self._failures.get(url)
+        if failure is None or failure[0] <= time.time():
+            return None
+        return failure[1]
+
+    def _key(self, url, size):
+        return hashlib.sha256(f"{size}:{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".jpg")
+
+    def _read(self, key):
+        with self.lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            # Removed behind our back; forget it and refetch
+            with self.lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def _store(self, key, data):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used files until the cache fits max_bytes (caller holds the lock)"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _download(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": "vna-image-edit thumbnailer"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    @staticmethod
+    def _resize(data, size):
+        image = Image.open(io.BytesIO(data))
+        image.thumbnail((size, size))
+
+        # JPEG has no alpha channel: flatten transparent images onto white
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        return output.getvalue()
+
+
+class ImagePrefetcher:
+    """Loads upcoming images on background workers into a bounded in-memory LRU in front of a ThumbnailCache
+
+    hits/misses count get() calls answered from memory versus loaded on demand.
+    """
+
+    def __init__(self, cache, size=PREVIEW_SIZE, depth=PREFETCH_DEPTH, max_memory_bytes=PREFETCH_MEMORY_BYTES,
+                 max_workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self.size = size
+        self.depth = depth
+        self.max_memory_bytes = max_memory_bytes
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-prefetch")
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._pending = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.errors = 0
+
+    def get(self, url):
+        """Image bytes for url, from memory when it was prefetched"""
+        with self.lock:
+            data = self._memory.get(url)
+            if data is not None:
+                self._memory.move_to_end(url)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        data = self.cache.get(url, self.size)
+        self._remember(url, data)
+        return data
+
+    def prefetch(self, urls):
+        """Queue the first `depth` URLs that are not in memory or already being loaded"""
+        for url in list(urls)[:self.depth]:
+            if not isinstance(url, str) or not url:
+                continue
+            with self.lock:
+                if url in self._memory or url in self._pending:
+                    continue
+                self._pending.add(url)
+            self.executor.submit(self._load, url)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "errors": self.errors,
+                "cached_images": len(self._memory),
+                "memory_bytes": self._memory_bytes
+            }
+
+    def _load(self, url):
+        try:
+            data = self.cache.get(url, self.size)
+            self._remember(url, data)
+            with self.lock:
+                self.prefetched += 1
+        except Exception:
+            with self.lock:
+                self.errors += 1
+        finally:
+            with self.lock:
+                self._pending.discard(url)
+
+    def _remember(self, url, data):
+        with self.lock:
+            self._memory_bytes += len(data) - len(self._memory.pop(url, b""))
+            self._memory[url] = data
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)